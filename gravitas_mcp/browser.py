@@ -10,8 +10,11 @@ from __future__ import annotations
 import asyncio
 import base64
 import json
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator
 
 from .memory import _tool_result
 
@@ -21,6 +24,46 @@ _playwright = None
 # Order: try system Chrome/Edge first so no "playwright install chromium" is required
 _BROWSER_CHANNELS = ["chrome", "msedge","firefox", "chromium"]
 
+# channel -> (playwright browser type, launch channel); None = Playwright's bundled build of that type
+_CHANNEL_LAUNCH = {
+    "chrome": ("chromium", "chrome"),
+    "msedge": ("chromium", "msedge"),
+    "firefox": ("firefox", None),
+    "chromium": ("chromium", None),
+}
+
+# First channel that launched in this process; later engines try it before probing the rest
+_resolved_channel: str | None = None
+
+DEFAULT_SESSION = "default"
+DEFAULT_MAX_CONTEXTS = 8
+CONTEXT_WAIT_TIMEOUT_SEC = 30.0
+DEFAULT_MAX_CONSOLE_ERRORS = 256  # per session; oldest errors are dropped first
+PREVIEW_RAW_BYTES = 150  # -> 200 base64 chars
+_VIEWPORT = {"width": 1280, "height": 720}
+_USER_AGENT = "Gravitas-Core-MCP/1.0 (Playwright)"
+
+# One in-page round trip for hover_many: synthetic pointer/mouse enter+over events per selector
+_HOVER_MANY_JS = """(sels) => sels.map((s) => {
+  const el = document.querySelector(s);
+  if (!el) return {selector: s, ok: false};
+  for (const type of ["pointerover", "pointerenter", "mouseover", "mouseenter"]) {
+    const bubbles = !type.endsWith("enter");
+    el.dispatchEvent(new MouseEvent(type, {bubbles, cancelable: bubbles, view: window}));
+  }
+  return {selector: s, ok: true};
+})"""
+
+# Installed in every document of our contexts: counts DOM mutations so a cached accessibility tree
+# can be reused only while the page has not changed under it (timers, XHR, script-driven updates)
+_DOM_REV_INIT_JS = """(() => {
+  window.__gravitasDomRev = 0;
+  new MutationObserver(() => { window.__gravitasDomRev++; }).observe(document, {
+    subtree: true, childList: true, attributes: true, characterData: true,
+  });
+})()"""
+_DOM_REV_JS = "() => window.__gravitasDomRev ?? null"
+
 
 def _get_playwright():
     global _playwright
@@ -37,17 +80,24 @@ def _get_playwright():
 
 
 async def _launch_any_available_browser(playwright):
-    """Launch first available browser: system Chrome, Edge, or Playwright Chromium."""
+    """Launch first available browser: system Chrome, Edge, or Playwright Firefox/Chromium."""
+    global _resolved_channel
     pw = playwright
     last_error = None
-    for channel in _BROWSER_CHANNELS:
+    channels = _BROWSER_CHANNELS
+    if _resolved_channel is not None:
+        # Still fall back to the full list in case that browser went away
+        channels = [_resolved_channel] + [c for c in _BROWSER_CHANNELS if c != _resolved_channel]
+    for channel in channels:
+        browser_type, launch_channel = _CHANNEL_LAUNCH[channel]
         try:
-            if channel == "chromium":
-                # Playwright's bundled Chromium (may require: playwright install chromium)
-                browser = await pw.chromium.launch(headless=False)  # Visible browser
+            if launch_channel is None:
+                # Playwright's bundled build (may require: playwright install chromium / firefox)
+                browser = await getattr(pw, browser_type).launch(headless=False)  # Visible browser
             else:
                 # System-installed browser (no extra install)
-                browser = await pw.chromium.launch(headless=False, channel=channel)  # Visible browser
+                browser = await getattr(pw, browser_type).launch(headless=False, channel=launch_channel)  # Visible browser
+            _resolved_channel = channel
             return browser, channel
         except Exception as e:
             last_error = e
@@ -57,67 +107,238 @@ async def _launch_any_available_browser(playwright):
     ) from last_error
 
 
+async def _close_quietly(context) -> None:
+    try:
+        await context.close()
+    except Exception:
+        pass
+
+
+@dataclass
+class _PageSession:
+    """One logical browsing session: a pooled context, its page, and that page's most recent console errors."""
+
+    context: Any
+    page: Any
+    console_errors: deque[str] = field(default_factory=lambda: deque(maxlen=DEFAULT_MAX_CONSOLE_ERRORS))
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Bumped on main-frame navigation, on DOMContentLoaded/load (a snapshot taken in between sees a
+    # partly loaded page) and on our own interactions; invalidates a11y_cache
+    nav_count: int = 0
+    a11y_cache: tuple[tuple[str, int, int], tuple[Any, str]] | None = None
+    # Lazily attached CDP session (Chromium only); cdp_supported goes False after a failed attach
+    cdp: Any = None
+    cdp_supported: bool = True
+
+    def on_console(self, msg) -> None:
+        if msg.type == "error":
+            self.console_errors.append(msg.text)
+
+    def on_frame_navigated(self, frame) -> None:
+        if frame == self.page.main_frame:
+            self.nav_count += 1
+
+    def on_load(self, _page) -> None:
+        self.nav_count += 1
+
+    async def accessibility_tree(self) -> tuple[Any, str]:
+        """
+        (tree, format). On Chromium one CDP Accessibility.getFullAXTree call returns the flat AXNode
+        list ("cdp"); elsewhere falls back to Playwright's nested page.accessibility tree ("playwright").
+        """
+        if self.cdp is None and self.cdp_supported:
+            try:
+                self.cdp = await self.context.new_cdp_session(self.page)
+            except Exception:
+                self.cdp_supported = False
+        if self.cdp is not None:
+            resp = await self.cdp.send("Accessibility.getFullAXTree")
+            return resp.get("nodes", []), "cdp"
+        return await self.page.accessibility.snapshot(), "playwright"
+
+    async def dom_revision(self) -> int | None:
+        """The page's DOM mutation count (see _DOM_REV_INIT_JS), or None when it cannot be read."""
+        try:
+            return await self.page.evaluate(_DOM_REV_JS)
+        except Exception:
+            return None
+
+    async def cached_accessibility_tree(self, refresh: bool = False) -> tuple[Any, str]:
+        """
+        accessibility_tree(), reused until the URL, nav_count or DOM revision changes. State the
+        observer cannot see (e.g. a typed input value, focus) needs refresh=True.
+        """
+        rev = await self.dom_revision()
+        key = (self.page.url, self.nav_count, rev)
+        if refresh or rev is None or self.a11y_cache is None or self.a11y_cache[0] != key:
+            self.a11y_cache = (key, await self.accessibility_tree())
+        return self.a11y_cache[1]
+
+
 class BrowserEngine:
     """
     Playwright-based browser automation: uses system Chrome/Edge when available,
     otherwise Playwright's Chromium. No mandatory 'playwright install' if Chrome/Edge exists.
+
+    One browser is launched per engine, or an already running Chromium is shared over CDP
+    when cdp_url / GRAVITAS_CDP_URL is set. Each session id gets its own BrowserContext + Page,
+    taken from a pool of at most max_contexts contexts, so different sessions run in parallel
+    while calls within one session stay ordered.
     """
 
-    def __init__(self, project_root: str | Path | None = None):
+    def __init__(
+        self,
+        project_root: str | Path | None = None,
+        max_contexts: int = DEFAULT_MAX_CONTEXTS,
+        cdp_url: str | None = None,
+        max_console_errors: int = DEFAULT_MAX_CONSOLE_ERRORS,
+    ):
         import os
         self._root = Path(project_root or os.getcwd()).resolve()
+        self._cdp_url = cdp_url or os.environ.get("GRAVITAS_CDP_URL") or None
         self._pw = None
         self._browser = None
-        self._context = None
-        self._page = None
-        self._console_errors: list[str] = []
         self._browser_channel: str | None = None
+        self._max_contexts = max_contexts
+        self._max_console_errors = max_console_errors
+        self._contexts_open = 0
+        self._ctx_pool: asyncio.Queue[Any] = asyncio.Queue()  # idle contexts, pages closed
+        self._sessions: dict[str, _PageSession] = {}
+        self._launch_lock = asyncio.Lock()
+        self._sessions_lock = asyncio.Lock()
 
-    async def _ensure_browser(self) -> None:
-        if self._browser is None:
-            pw = _get_playwright()
-            self._pw = await pw().start()
-            self._browser, self._browser_channel = await _launch_any_available_browser(self._pw)
-            self._context = await self._browser.new_context(
-                viewport={"width": 1280, "height": 720},
-                user_agent="Gravitas-Core-MCP/1.0 (Playwright)",
-            )
-            self._page = await self._context.new_page()
-            self._console_errors = []
+    async def _ensure_launched(self) -> None:
+        if self._browser is not None:
+            return
+        async with self._launch_lock:
+            if self._browser is None:
+                pw = _get_playwright()
+                self._pw = await pw().start()
+                if self._cdp_url:
+                    # Shared browser (e.g. chrome --remote-debugging-port=9222); we only own our contexts
+                    self._browser = await self._pw.chromium.connect_over_cdp(self._cdp_url)
+                    self._browser_channel = "cdp"
+                else:
+                    self._browser, self._browser_channel = await _launch_any_available_browser(self._pw)
 
-            def on_console(msg):
-                if msg.type == "error":
-                    self._console_errors.append(msg.text)
+    async def _new_context(self) -> Any:
+        context = await self._browser.new_context(viewport=_VIEWPORT, user_agent=_USER_AGENT)
+        try:
+            await context.add_init_script(_DOM_REV_INIT_JS)
+        except BaseException:
+            await _close_quietly(context)
+            raise
+        return context
 
-            self._page.on("console", on_console)
+    async def _checkout_context(self) -> Any:
+        """Idle pooled context, a new one while under max_contexts, else wait (bounded) for a session to close."""
+        try:
+            return self._ctx_pool.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        if self._contexts_open < self._max_contexts:
+            self._contexts_open += 1
+            try:
+                return await self._new_context()
+            except BaseException:
+                self._contexts_open -= 1
+                raise
+        try:
+            return await asyncio.wait_for(self._ctx_pool.get(), timeout=CONTEXT_WAIT_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            raise RuntimeError(
+                f"All {self._max_contexts} browser contexts are in use; close a session with browser_close_session"
+            ) from None
+
+    async def _session(self, session: str) -> _PageSession:
+        sess = self._sessions.get(session)
+        if sess is not None:
+            return sess
+        await self._ensure_launched()
+        async with self._sessions_lock:
+            sess = self._sessions.get(session)
+            if sess is None:
+                context = await self._checkout_context()
+                page = await context.new_page()
+                sess = _PageSession(
+                    context=context, page=page, console_errors=deque(maxlen=self._max_console_errors)
+                )
+                page.on("console", sess.on_console)
+                page.on("framenavigated", sess.on_frame_navigated)
+                page.on("domcontentloaded", sess.on_load)
+                page.on("load", sess.on_load)
+                self._sessions[session] = sess
+        return sess
+
+    @asynccontextmanager
+    async def _acquire_session(self, session: str) -> AsyncIterator[_PageSession]:
+        """Exclusive use of the session's page for the duration of one tool call."""
+        sess = await self._session(session)
+        async with sess.lock:
+            yield sess
+
+    async def close_session(self, session: str = DEFAULT_SESSION) -> dict[str, Any]:
+        """
+        Close the session's page and context, putting a fresh context in the pool in its place.
+        Reusing the old one would leak localStorage, IndexedDB, cache, service workers and
+        permissions into whichever session checks it out next.
+        """
+        sess = self._sessions.pop(session, None)
+        if sess is None:
+            return _tool_result(
+                "failure",
+                errors=[f"Unknown browser session: {session}"],
+                next_recommended_action="Use a session id passed to an earlier browser call.",
+            )
+        async with sess.lock:
+            await _close_quietly(sess.context)
+            try:
+                fresh = await self._new_context()
+            except Exception:
+                # browser unusable; free the slot so a later checkout can retry
+                self._contexts_open -= 1
+            else:
+                self._ctx_pool.put_nowait(fresh)
+        return _tool_result(
+            "success",
+            observations={"session": session, "closed": True},
+            next_recommended_action="Proceed.",
+        )
 
     async def close(self) -> None:
-        if self._context:
-            await self._context.close()
-        if self._browser:
+        sessions, self._sessions = self._sessions, {}
+        for sess in sessions.values():
+            await _close_quietly(sess.context)
+        while not self._ctx_pool.empty():
+            await _close_quietly(self._ctx_pool.get_nowait())
+        self._contexts_open = 0
+        if self._browser and not self._cdp_url:
+            # a CDP-shared browser belongs to whoever started it; stopping playwright just disconnects
             await self._browser.close()
         if self._pw:
             await self._pw.stop()
         self._pw = None
         self._browser = None
-        self._context = None
-        self._page = None
 
-    async def navigate(self, url: str, wait_until: str = "domcontentloaded") -> dict[str, Any]:
+    async def navigate(
+        self, url: str, wait_until: str = "domcontentloaded", session: str = DEFAULT_SESSION
+    ) -> dict[str, Any]:
         """Navigate to URL and optionally wait. wait_until: load, domcontentloaded, networkidle."""
         try:
-            await self._ensure_browser()
-            self._console_errors = []
-            await self._page.goto(url, wait_until=wait_until, timeout=30000)
-            return _tool_result(
-                "success",
-                observations={
-                    "url": self._page.url,
-                    "title": await self._page.title(),
-                    "console_errors": list(self._console_errors),
-                },
-                next_recommended_action="Use snapshot or screenshot to verify page.",
-            )
+            async with self._acquire_session(session) as sess:
+                page = sess.page
+                sess.console_errors.clear()
+                await page.goto(url, wait_until=wait_until, timeout=30000)
+                sess.nav_count += 1
+                return _tool_result(
+                    "success",
+                    observations={
+                        "url": page.url,
+                        "title": await page.title(),
+                        "console_errors": list(sess.console_errors),
+                    },
+                    next_recommended_action="Use snapshot or screenshot to verify page.",
+                )
         except Exception as e:
             return _tool_result(
                 "failure",
@@ -125,21 +346,29 @@ class BrowserEngine:
                 next_recommended_action="Check URL and network.",
             )
 
-    async def snapshot(self) -> dict[str, Any]:
-        """Capture DOM snapshot (accessibility tree) and console errors."""
+    async def snapshot(self, session: str = DEFAULT_SESSION, refresh: bool = False) -> dict[str, Any]:
+        """
+        Capture DOM snapshot (accessibility tree) and console errors. The tree is reused while the
+        page is unchanged; refresh=True always re-reads it.
+        """
         try:
-            await self._ensure_browser()
-            tree = await self._page.accessibility.snapshot()
-            return _tool_result(
-                "success",
-                observations={
-                    "url": self._page.url,
-                    "title": await self._page.title(),
-                    "accessibility_tree": tree,
-                    "console_errors": list(self._console_errors),
-                },
-                next_recommended_action="Inspect tree and errors for verification.",
-            )
+            async with self._acquire_session(session) as sess:
+                page = sess.page
+                # Independent protocol calls on the same page: one round trip instead of two
+                (tree, tree_format), title = await asyncio.gather(
+                    sess.cached_accessibility_tree(refresh), page.title()
+                )
+                return _tool_result(
+                    "success",
+                    observations={
+                        "url": page.url,
+                        "title": title,
+                        "accessibility_tree": tree,
+                        "accessibility_format": tree_format,
+                        "console_errors": list(sess.console_errors),
+                    },
+                    next_recommended_action="Inspect tree and errors for verification.",
+                )
         except Exception as e:
             return _tool_result(
                 "failure",
@@ -147,28 +376,30 @@ class BrowserEngine:
                 next_recommended_action="Ensure page is loaded; navigate first.",
             )
 
-    async def screenshot(self, path: str | Path | None = None) -> dict[str, Any]:
+    async def screenshot(self, path: str | Path | None = None, session: str = DEFAULT_SESSION) -> dict[str, Any]:
         """Take screenshot; save to path if provided, else return base64 in observations."""
         try:
-            await self._ensure_browser()
-            if path:
-                out = Path(path)
-                if not out.is_absolute():
-                    out = self._root / out
-                out.parent.mkdir(parents=True, exist_ok=True)
-                await self._page.screenshot(path=str(out))
+            async with self._acquire_session(session) as sess:
+                page = sess.page
+                if path:
+                    out = Path(path)
+                    if not out.is_absolute():
+                        out = self._root / out
+                    out.parent.mkdir(parents=True, exist_ok=True)
+                    await page.screenshot(path=str(out))
+                    return _tool_result(
+                        "success",
+                        observations={"path": str(out), "url": page.url},
+                        next_recommended_action="Inspect screenshot for UI verification.",
+                    )
+                buf = await page.screenshot(type="png")
+                # Only a 200-char preview is returned; 150 raw bytes encode to exactly those 200 chars
+                preview = base64.standard_b64encode(buf[:PREVIEW_RAW_BYTES]).decode("ascii")
                 return _tool_result(
                     "success",
-                    observations={"path": str(out), "url": self._page.url},
-                    next_recommended_action="Inspect screenshot for UI verification.",
+                    observations={"image_base64": preview + "...", "url": page.url, "console_errors": list(sess.console_errors)},
+                    next_recommended_action="Use snapshot for full DOM or save to file next time.",
                 )
-            buf = await self._page.screenshot()
-            b64 = base64.standard_b64encode(buf).decode("ascii")
-            return _tool_result(
-                "success",
-                observations={"image_base64": b64[:200] + "...", "url": self._page.url, "console_errors": list(self._console_errors)},
-                next_recommended_action="Use snapshot for full DOM or save to file next time.",
-            )
         except Exception as e:
             return _tool_result(
                 "failure",
@@ -176,28 +407,53 @@ class BrowserEngine:
                 next_recommended_action="Ensure page is loaded; navigate first.",
             )
 
-    async def get_console_errors(self) -> dict[str, Any]:
+    async def get_console_errors(self, session: str = DEFAULT_SESSION) -> dict[str, Any]:
         """Return collected JS console errors since last navigate."""
-        await self._ensure_browser()
-        return _tool_result(
-            "success",
-            observations={"console_errors": list(self._console_errors), "url": self._page.url},
-            next_recommended_action="Fix reported errors in code.",
-        )
+        async with self._acquire_session(session) as sess:
+            return _tool_result(
+                "success",
+                observations={"console_errors": list(sess.console_errors), "url": sess.page.url},
+                next_recommended_action="Fix reported errors in code.",
+            )
 
-    async def hover(self, selector: str) -> dict[str, Any]:
+    async def hover(self, selector: str, session: str = DEFAULT_SESSION) -> dict[str, Any]:
         """Hover over an element by CSS selector."""
         try:
-            await self._ensure_browser()
-            await self._page.hover(selector, timeout=30000)
+            async with self._acquire_session(session) as sess:
+                await sess.page.hover(selector, timeout=30000)
+                sess.nav_count += 1  # hover can reveal menus/tooltips
+                return _tool_result(
+                    "success",
+                    observations={"selector": selector, "url": sess.page.url},
+                    next_recommended_action="Element hovered successfully.",
+                )
+        except Exception as e:
             return _tool_result(
-                "success",
-                observations={"selector": selector, "url": self._page.url},
-                next_recommended_action="Element hovered successfully.",
+                "failure",
+                errors=[str(e)],
+                next_recommended_action="Check selector and ensure page is loaded.",
             )
+
+    async def hover_many(self, selectors: list[str], session: str = DEFAULT_SESSION) -> dict[str, Any]:
+        """
+        Hover several CSS selectors in one page.evaluate round trip. Elements get synthetic
+        pointer/mouse over+enter events (JS hover handlers fire; CSS :hover does not apply);
+        use hover for a real pointer move.
+        """
+        try:
+            async with self._acquire_session(session) as sess:
+                results = await sess.page.evaluate(_HOVER_MANY_JS, list(selectors))
+                sess.nav_count += 1  # handlers can reveal menus/tooltips
+                missing = [r["selector"] for r in results if not r["ok"]]
+                return _tool_result(
+                    "failure" if missing else "success",
+                    observations={"results": results, "url": sess.page.url},
+                    errors=[f"No element matches selector: {s}" for s in missing],
+                    next_recommended_action="Check missing selectors." if missing else "Elements hovered successfully.",
+                )
         except Exception as e:
             return _tool_result(
                 "failure",
                 errors=[str(e)],
-                next_recommended_action="Check selector and ensure page is loaded.",
+                next_recommended_action="Check selectors and ensure page is loaded.",
             )
@@ -7,9 +7,13 @@ Prevents infinite loops and uncontrolled tool usage.
 
 from __future__ import annotations
 
+import asyncio
+import itertools
+import secrets
+import time
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from .memory import Memory, _tool_result
 
@@ -46,9 +50,28 @@ class TaskContext:
     metadata: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class Step:
+    """
+    One unit of work for Controller.run_pipelined: the state the task enters, then an optional
+    action (e.g. a browser/terminal call) returning a tool contract dict.
+    """
+
+    state: str
+    action: Callable[[], Awaitable[dict[str, Any]]] | None = None
+    name: str = ""
+
+
 # Default policy
 DEFAULT_POLICY = RetryPolicy()
 
+_TERMINAL_STATES = frozenset({TaskState.COMPLETED.value, TaskState.ROLLBACK.value})
+
+# Task ids: wall-clock ms + per-process tag + per-process counter. The tag keeps ids from two servers
+# sharing one brain DB apart without drawing fresh randomness for every task.
+_PROCESS_TAG = secrets.token_hex(2)
+_task_counter = itertools.count()
+
 
 class Controller:
     """
@@ -62,9 +85,7 @@ class Controller:
 
     def create_task(self, goal: str, task_id: str | None = None) -> dict[str, Any]:
         """Create a new task and set state to PLANNING."""
-        import time
-        import os
-        tid = task_id or f"task_{int(time.time() * 1000)}_{os.urandom(4).hex()}"
+        tid = task_id or f"task_{time.time_ns() // 1_000_000}_{_PROCESS_TAG}{next(_task_counter) & 0xFFFF:04x}"
         self._memory.upsert_task(tid, goal, TaskState.PLANNING.value)
         self._context = TaskContext(task_id=tid, goal=goal, state=TaskState.PLANNING)
         return _tool_result(
@@ -91,7 +112,7 @@ class Controller:
         self._memory.upsert_task(task_id, goal, new_state)
         if self._context and self._context.task_id == task_id:
             self._context.state = TaskState(new_state)
-            if new_state in (TaskState.COMPLETED.value, TaskState.ROLLBACK.value):
+            if new_state in _TERMINAL_STATES:
                 self._context.step_retry_count = 0
                 self._context.identical_failure_count = 0
         return _tool_result(
@@ -102,80 +123,118 @@ class Controller:
 
     def record_step_failure(self, task_id: str, reason: str) -> dict[str, Any]:
         """Record a step failure; may trigger FAILED_RETRY or ROLLBACK."""
-        if not self._context or self._context.task_id != task_id:
-            self._context = TaskContext(task_id=task_id, goal="", state=TaskState.FAILED_RETRY)
-        self._context.step_retry_count += 1
-        if reason == self._context.last_failure_reason:
-            self._context.identical_failure_count += 1
+        ctx = self._context
+        if not ctx or ctx.task_id != task_id:
+            ctx = self._context = TaskContext(task_id=task_id, goal="", state=TaskState.FAILED_RETRY)
+        ctx.step_retry_count += 1
+        if reason == ctx.last_failure_reason:
+            ctx.identical_failure_count += 1
         else:
-            self._context.last_failure_reason = reason
-            self._context.identical_failure_count = 1
-
-        if self._context.identical_failure_count >= self._policy.identical_failure_threshold:
-            self._memory.upsert_task(task_id, self._context.goal or "", TaskState.ROLLBACK.value)
-            return _tool_result(
-                "success",
-                observations={
-                    "task_id": task_id,
-                    "state": TaskState.ROLLBACK.value,
-                    "reason": "Repeated identical failure; mandatory rollback.",
-                },
-                next_recommended_action="Perform rollback using canonical state; then re-plan.",
-            )
-        if self._context.step_retry_count >= self._policy.max_retries_per_step:
-            self._memory.upsert_task(task_id, self._context.goal or "", TaskState.FAILED_RETRY.value)
-            return _tool_result(
-                "success",
-                observations={
-                    "task_id": task_id,
-                    "state": TaskState.FAILED_RETRY.value,
-                    "reason": "Max retries per step exceeded.",
-                },
-                next_recommended_action="Escalate or rollback; do not retry same step again.",
-            )
-        self._memory.upsert_task(task_id, self._context.goal or "", TaskState.FAILED_RETRY.value)
+            ctx.last_failure_reason = reason
+            ctx.identical_failure_count = 1
+
+        policy = self._policy
+        if ctx.identical_failure_count >= policy.identical_failure_threshold:
+            ctx.state = TaskState.ROLLBACK
+            extra = {"reason": "Repeated identical failure; mandatory rollback."}
+            next_action = "Perform rollback using canonical state; then re-plan."
+        elif ctx.step_retry_count >= policy.max_retries_per_step:
+            ctx.state = TaskState.FAILED_RETRY
+            extra = {"reason": "Max retries per step exceeded."}
+            next_action = "Escalate or rollback; do not retry same step again."
+        else:
+            ctx.state = TaskState.FAILED_RETRY
+            extra = {"retry_count": ctx.step_retry_count}
+            next_action = "Retry with a different approach; avoid repeating same failure."
+        self._memory.upsert_task(task_id, ctx.goal or "", ctx.state.value)
         return _tool_result(
             "success",
-            observations={
-                "task_id": task_id,
-                "state": TaskState.FAILED_RETRY.value,
-                "retry_count": self._context.step_retry_count,
-            },
-            next_recommended_action="Retry with a different approach; avoid repeating same failure.",
+            observations={"task_id": task_id, "state": ctx.state.value, **extra},
+            next_recommended_action=next_action,
         )
 
     def get_state(self, task_id: str) -> dict[str, Any]:
         """Return current task state and policy info."""
-        last = self._memory.get_last_state()
-        tasks = last.get("observations", {}).get("active_task") or last.get("observations", {}).get("last_snapshot")
-        # Prefer explicit task lookup via resume
-        resume = self._memory.resume_task(task_id)
-        if resume.get("status") != "success":
-            return resume
-        task = resume["observations"].get("task")
-        if not task:
-            return _tool_result("failure", errors=["Task not found"], next_recommended_action="Create or list tasks.")
+        # The tracked context is written through on every transition, so it is as fresh as the DB row
+        if self._context and self._context.task_id == task_id:
+            state, goal = self._context.state.value, self._context.goal
+        else:
+            resume = self._memory.resume_task(task_id)
+            if resume.get("status") != "success":
+                return resume
+            task = resume["observations"].get("task")
+            if not task:
+                return _tool_result("failure", errors=["Task not found"], next_recommended_action="Create or list tasks.")
+            state, goal = task["state"], task["goal"]
         return _tool_result(
             "success",
             observations={
                 "task_id": task_id,
-                "state": task["state"],
-                "goal": task["goal"],
+                "state": state,
+                "goal": goal,
                 "policy": {
                     "max_retries_per_step": self._policy.max_retries_per_step,
                     "identical_failure_threshold": self._policy.identical_failure_threshold,
                 },
             },
-            next_recommended_action=_next_action_for_state(task["state"]),
+            next_recommended_action=_next_action_for_state(state),
         )
 
     def is_complete(self, task_id: str) -> bool:
         """Return True if task is COMPLETED or ROLLBACK (terminal)."""
+        if self._context and self._context.task_id == task_id:
+            return self._context.state.value in _TERMINAL_STATES
         resume = self._memory.resume_task(task_id)
         if resume.get("status") != "success":
             return False
         state = (resume.get("observations") or {}).get("task", {}).get("state")
-        return state in (TaskState.COMPLETED.value, TaskState.ROLLBACK.value)
+        return state in _TERMINAL_STATES
+
+    async def run_pipelined(self, task_id: str, steps: list[Step]) -> dict[str, Any]:
+        """
+        Run steps in order. Each step's action is started first and the transition is persisted once
+        the action is waiting on I/O, so the memory write overlaps its browser/terminal round trip
+        instead of adding to it. Everything stays on the event loop thread (Memory is not thread-safe).
+        Stops at the first failed action and records it via record_step_failure.
+        """
+        valid = {s.value for s in TaskState}
+        bad = [s.state for s in steps if s.state not in valid]
+        if bad:
+            return _tool_result(
+                "failure",
+                errors=[f"Invalid state: {state}. Valid: {list(valid)}" for state in bad],
+                next_recommended_action="Use one of the required states.",
+            )
+        results: list[dict[str, Any]] = []
+        for i, step in enumerate(steps):
+            name = step.name or f"step_{i}"
+            if step.action is None:
+                self.transition(task_id, step.state)
+                continue
+            action = asyncio.ensure_future(step.action())
+            await asyncio.sleep(0)  # let the action run up to its first await (request sent)
+            try:
+                self.transition(task_id, step.state)
+            except BaseException:
+                action.cancel()
+                raise
+            result = await action
+            results.append({"step": name, "status": result.get("status"), "observations": result.get("observations", {})})
+            if result.get("status") != "success":
+                reason = "; ".join(result.get("errors") or []) or f"{name} failed"
+                failure = self.record_step_failure(task_id, reason)
+                return _tool_result(
+                    "failure",
+                    observations={"task_id": task_id, "failed_step": name, "results": results, **failure["observations"]},
+                    errors=[reason],
+                    next_recommended_action=failure["next_recommended_action"],
+                )
+        state = steps[-1].state if steps else None
+        return _tool_result(
+            "success",
+            observations={"task_id": task_id, "state": state, "results": results},
+            next_recommended_action=_next_action_for_state(state) if state else "Add steps to run.",
+        )
 
 
 def _next_action_for_state(state: str) -> str:
@@ -1,3 +1,6 @@
+import importlib.util
+import sys
+
 import uvicorn
 import anyio
 from starlette.applications import Starlette
@@ -6,9 +9,21 @@ from starlette.responses import Response
 from mcp.server.sse import SseServerTransport
 from gravitas_mcp.server import app as mcp_app
 
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+# uvloop/httptools speed up accept/read/write on the SSE path; uvloop has no Windows build.
+LOOP = "uvloop" if sys.platform != "win32" and _installed("uvloop") else "asyncio"
+HTTP = "httptools" if _installed("httptools") else "h11"
+
 # Create SSE Transport with correct path
 sse = SseServerTransport("/messages/")
 
+# Handlers are all registered at import time, so the advertised capabilities never change per connection
+INIT_OPTIONS = mcp_app.create_initialization_options()
+
 
 async def handle_sse(request):
     """
@@ -21,11 +36,8 @@ async def handle_sse(request):
             request.receive, 
             request._send
         ) as (read_stream, write_stream):
-            # Run the MCP app in a task group to handle the session
-            async with anyio.create_task_group() as tg:
-                tg.start_soon(mcp_app.run, read_stream, write_stream, mcp_app.create_initialization_options())
-                # Keep the task group alive while connection is active
-                await anyio.sleep_forever()
+            # The session lives exactly as long as mcp_app.run; it returns when the client disconnects
+            await mcp_app.run(read_stream, write_stream, INIT_OPTIONS)
     except anyio.get_cancelled_exc():
         # Clean shutdown when client disconnects
         pass
@@ -43,4 +55,4 @@ starlette_app = Starlette(
 
 
 if __name__ == "__main__":
-    uvicorn.run(starlette_app, host="0.0.0.0", port=8765, log_level="info", )
+    uvicorn.run(starlette_app, host="0.0.0.0", port=8765, loop=LOOP, http=HTTP, log_level="info")
@@ -7,15 +7,91 @@ failure memory, and tool usage patterns. SQLite-backed, local-only.
 
 from __future__ import annotations
 
+import copy
 import json
 import os
+import queue
 import sqlite3
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any
 
+try:  # optional C-accelerated JSON; stdlib json otherwise
+    import orjson
+except ImportError:
+    orjson = None
+
+try:  # optional; without it large blobs are stored uncompressed
+    import zstandard
+except ImportError:
+    zstandard = None
+
 DB_NAME = ".gravitas_brain.db"
+MAX_BATCH_SIZE = 128
+BATCH_WAIT_TIMEOUT_S = 0.01
+COMPRESS_MIN_BYTES = 4096
+ZSTD_LEVEL = 3
+STATEMENT_CACHE_SIZE = 128
+ID_RANDOM_POOL_BYTES = 4096
+TASK_CACHE_SIZE = 256
+FETCH_CHUNK_SIZE = 64
+READ_POOL_SIZE = 4
+# Bump whenever the schema script in _ensure_schema changes so existing databases re-run it
+SCHEMA_VERSION = 2
+
+# Per-connection tuning shared by the writer and the read-only pool
+_CONNECTION_PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",  # 20 MB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA busy_timeout=5000",
+)
+
+# Version byte prefixed to BLOB-encoded JSON columns. Plain TEXT rows are uncompressed JSON.
+_BLOB_ZSTD = 0x01
+
+_TASK_FIELDS = ("id", "parent_id", "goal", "state", "created_at", "updated_at", "completed_at", "metadata")
+_SNAPSHOT_FIELDS = ("id", "task_id", "created_at", "project_map", "safe_to_edit", "do_not_touch", "metadata")
+
+# Fixed statement texts: reusing the same strings keeps every query a hit in
+# the connection's prepared-statement cache.
+_SQL: dict[str, str] = {
+    "task_by_id": """SELECT id, parent_id, goal, state, created_at, updated_at, completed_at, metadata
+        FROM tasks WHERE id = ?""",
+    "active_task": """SELECT id, parent_id, goal, state, created_at, updated_at, completed_at, metadata
+        FROM tasks WHERE state NOT IN ('COMPLETED', 'ROLLBACK') ORDER BY updated_at DESC LIMIT 1""",
+    "upsert_task": """INSERT INTO tasks (id, parent_id, goal, state, created_at, updated_at, completed_at, metadata)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+          goal=excluded.goal, state=excluded.state, updated_at=excluded.updated_at,
+          completed_at=CASE WHEN excluded.state IN ('COMPLETED','ROLLBACK') THEN excluded.updated_at ELSE completed_at END,
+          metadata=excluded.metadata""",
+    "last_snapshot": """SELECT id, task_id, created_at, project_map, safe_to_edit, do_not_touch, metadata
+        FROM context_snapshots ORDER BY created_at DESC LIMIT 1""",
+    "task_with_latest_snapshot": """SELECT t.id, t.parent_id, t.goal, t.state, t.created_at, t.updated_at, t.completed_at, t.metadata,
+          s.id, s.task_id, s.created_at, s.project_map, s.safe_to_edit, s.do_not_touch, s.metadata
+        FROM tasks t
+        LEFT JOIN context_snapshots s ON s.id = (
+          SELECT id FROM context_snapshots WHERE task_id = t.id ORDER BY created_at DESC LIMIT 1
+        )
+        WHERE t.id = ?""",
+    "insert_snapshot": """INSERT INTO context_snapshots (id, task_id, created_at, project_map, safe_to_edit, do_not_touch, metadata)
+        VALUES (?, ?, ?, ?, ?, ?, ?)""",
+    "canonical_snapshot": """SELECT s.id, s.task_id, s.created_at, s.project_map, s.safe_to_edit, s.do_not_touch, s.metadata,
+          c.updated_at
+        FROM canonical_state c LEFT JOIN context_snapshots s ON s.id = c.snapshot_id
+        WHERE c.id = 1""",
+    "set_canonical": "INSERT OR REPLACE INTO canonical_state (id, snapshot_id, updated_at) VALUES (1, ?, ?)",
+    "task_failures": "SELECT id, reason, context, created_at FROM failures WHERE task_id = ? ORDER BY created_at DESC LIMIT ?",
+    "recent_failures": "SELECT id, reason, context, created_at FROM failures ORDER BY created_at DESC LIMIT ?",
+    "insert_failure": "INSERT INTO failures (id, reason, context, created_at, task_id) VALUES (?, ?, ?, ?, ?)",
+    "insert_tool_usage": "INSERT INTO tool_usage (id, tool_name, arguments, outcome_summary, created_at, task_id) VALUES (?, ?, ?, ?, ?, ?)",
+}
 
 
 @dataclass
@@ -68,6 +144,88 @@ class ToolUsageRecord:
     task_id: str | None
 
 
+def _dumps(obj: Any) -> str:
+    """Serialize obj to JSON text for a TEXT column."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits, which json handles
+    return json.dumps(obj)
+
+
+def _loads(text: str | bytes | None, default: Any = None) -> Any:
+    """Parse a JSON column; empty/NULL values yield default."""
+    if not text:
+        return default
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity written by json.dumps in older rows
+    return json.loads(text)
+
+
+def _pack(obj: Any) -> str | bytes:
+    """Encode a potentially large JSON column; zstd-compressed BLOB when worthwhile."""
+    text = _dumps(obj)
+    if zstandard is None or len(text) < COMPRESS_MIN_BYTES:
+        return text
+    return bytes((_BLOB_ZSTD,)) + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(text.encode())
+
+
+def _unpack(value: str | bytes | None, default: Any = None) -> Any:
+    """Inverse of _pack; also reads legacy TEXT rows."""
+    if not isinstance(value, bytes):
+        return _loads(value, default)
+    if not value:
+        return default
+    if value[0] != _BLOB_ZSTD:
+        raise ValueError(f"Unknown blob encoding: {value[0]}")
+    if zstandard is None:
+        raise RuntimeError("Snapshot is zstd-compressed; install zstandard to read it.")
+    return _loads(zstandard.ZstdDecompressor().decompress(value[1:]), default)
+
+
+def _snapshot_params(
+    snapshot_id: str,
+    task_id: str,
+    project_map: dict[str, Any],
+    safe_to_edit: list[str],
+    do_not_touch: list[str],
+    metadata: dict[str, Any] | None,
+) -> tuple:
+    return (
+        snapshot_id,
+        task_id,
+        time.time(),
+        _pack(project_map),
+        _dumps(safe_to_edit),
+        _dumps(do_not_touch),
+        _dumps(metadata or {}),
+    )
+
+
+def _tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """Cursor yielding plain tuples; rows are mapped by position, skipping sqlite3.Row wrapping."""
+    cur = conn.cursor()
+    cur.row_factory = None
+    return cur
+
+
+def _decode_snapshot(snapshot: dict[str, Any]) -> dict[str, Any]:
+    snapshot["project_map"] = _unpack(snapshot["project_map"], {})
+    snapshot["safe_to_edit"] = _loads(snapshot["safe_to_edit"], [])
+    snapshot["do_not_touch"] = _loads(snapshot["do_not_touch"], [])
+    snapshot["metadata"] = _loads(snapshot["metadata"], {})
+    return snapshot
+
+
+def _failure_from_row(row: tuple) -> dict[str, Any]:
+    """(id, reason, context, created_at) -> failure record."""
+    return {"id": row[0], "reason": row[1], "context": _loads(row[2], {}), "created_at": row[3]}
+
+
 def _tool_result(
     status: str,
     observations: dict[str, Any] | None = None,
@@ -86,20 +244,109 @@ def _tool_result(
 class Memory:
     """SQLite-backed persistent memory. Single writer, project-scoped."""
 
-    def __init__(self, project_root: str | Path | None = None):
+    def __init__(
+        self,
+        project_root: str | Path | None = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        batch_wait_timeout_s: float = BATCH_WAIT_TIMEOUT_S,
+    ):
         self._root = Path(project_root or os.getcwd()).resolve()
         self._db_path = self._root / DB_NAME
+        self._root_str = str(self._root)
         self._conn: sqlite3.Connection | None = None
+        self._journal_mode: str | None = None
+        self.max_batch_size = max_batch_size
+        self.batch_wait_timeout_s = batch_wait_timeout_s
+        self._batch_depth = 0
+        self._batch_pending = 0
+        self._batch_started = 0.0
+        self._savepoint_seq = 0
+        self._rand_buf = os.urandom(ID_RANDOM_POOL_BYTES)
+        self._rand_pos = 0
+        # Decoded hot reads, invalidated by our own writes and dropped whenever the writer
+        # connection's PRAGMA data_version shows a commit from another connection/process
+        self._cache_lock = threading.Lock()
+        self._cache_data_version: int | None = None
+        self._task_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._canonical_cached: tuple[dict[str, Any], float] | None = None
+        # Read-only connections so get_* calls don't serialize on the writer connection
+        self._read_pool: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        # Bumped by close(); readers checked out under an older generation are closed on return
+        self._pool_generation = 0
 
     def _connect(self) -> sqlite3.Connection:
         if self._conn is None:
-            self._conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
-            self._conn.row_factory = sqlite3.Row
+            self._conn = sqlite3.connect(
+                str(self._db_path), check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+            )
+            self._apply_pragmas(self._conn)
             self._ensure_schema()
         return self._conn
 
+    def _apply_pragmas(self, conn: sqlite3.Connection) -> None:
+        """WAL + NORMAL sync: one fsync per checkpoint instead of per commit; readers don't block the writer."""
+        mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        # WAL is unavailable on some filesystems (e.g. network mounts); SQLite keeps the old mode then.
+        self._journal_mode = str(mode).lower()
+        conn.execute("PRAGMA synchronous=NORMAL" if self._journal_mode == "wal" else "PRAGMA synchronous=FULL")
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+
+    def _open_reader(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"{self._db_path.as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _read_cursor(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Tuple cursor on a pooled read-only connection. Falls back to the writer
+        while it holds uncommitted batch() writes, which other connections can't see yet,
+        and when all READ_POOL_SIZE readers are checked out (never blocks waiting for one).
+        """
+        writer = self._connect()
+        self._flush_if_stale()
+        if writer.in_transaction:
+            yield _tuple_cursor(writer)
+            return
+        with self._readers_lock:
+            generation = self._pool_generation
+            try:
+                conn = self._read_pool.get_nowait()
+            except queue.Empty:
+                conn = self._open_reader() if len(self._readers) < READ_POOL_SIZE else None
+                if conn is not None:
+                    self._readers.append(conn)
+        if conn is None:
+            cur = _tuple_cursor(writer)
+            try:
+                yield cur
+            finally:
+                cur.close()
+            return
+        cur = _tuple_cursor(conn)
+        try:
+            yield cur
+        finally:
+            cur.close()
+            with self._readers_lock:
+                if generation == self._pool_generation:
+                    self._read_pool.put(conn)
+                else:
+                    conn.close()
+
     def _ensure_schema(self) -> None:
         conn = self._connect()
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
         conn.executescript("""
             CREATE TABLE IF NOT EXISTS tasks (
                 id TEXT PRIMARY KEY,
@@ -144,23 +391,136 @@ class Memory:
             );
             CREATE INDEX IF NOT EXISTS idx_tasks_parent ON tasks(parent_id);
             CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks(state);
+            CREATE INDEX IF NOT EXISTS idx_tasks_active ON tasks(updated_at DESC)
+                WHERE state NOT IN ('COMPLETED', 'ROLLBACK');
             CREATE INDEX IF NOT EXISTS idx_failures_created ON failures(created_at);
+            CREATE INDEX IF NOT EXISTS idx_failures_task_created ON failures(task_id, created_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_snapshots_created ON context_snapshots(created_at);
+            CREATE INDEX IF NOT EXISTS idx_snapshots_task_created ON context_snapshots(task_id, created_at DESC);
         """)
+        conn.execute("ANALYZE")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+
+    def _commit(self) -> None:
+        """Commit now, or defer to the enclosing batch() until it is full or old enough."""
+        conn = self._connect()
+        if self._batch_depth == 0:
+            conn.commit()
+            return
+        if self._batch_pending == 0:
+            self._batch_started = time.monotonic()
+        self._batch_pending += 1
+        if self._batch_pending >= self.max_batch_size:
+            self._flush()
+        else:
+            self._flush_if_stale()
+
+    def _flush(self) -> None:
+        if self._batch_pending and self._conn is not None:
+            self._conn.commit()
+        self._batch_pending = 0
+
+    def _flush_if_stale(self) -> None:
+        """Commit pending batch writes once they are batch_wait_timeout_s old, releasing the write lock."""
+        if self._batch_pending and time.monotonic() - self._batch_started >= self.batch_wait_timeout_s:
+            self._flush()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run several statements as one atomic unit. Opens BEGIN IMMEDIATE so the write
+        lock is taken up front; inside a pending batch() the statements join that
+        transaction under a SAVEPOINT (so a failure undoes only them) and count as a
+        single deferred write.
+        """
+        conn = self._connect()
+        if conn.in_transaction:
+            self._savepoint_seq += 1
+            name = f"gravitas_tx{self._savepoint_seq}"
+            conn.execute(f"SAVEPOINT {name}")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute(f"ROLLBACK TO {name}")
+                conn.execute(f"RELEASE {name}")
+                raise
+            conn.execute(f"RELEASE {name}")
+            self._commit()
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
         conn.commit()
 
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Group bursts of writes into few transactions. Inside the block, pending writes
+        commit once max_batch_size accumulate, or on the next write/read once they are
+        batch_wait_timeout_s old (long stretches with no Memory calls keep the write lock),
+        and once more on a clean exit. An exception escaping the block rolls back the
+        writes not committed yet. Outside a batch every write commits immediately.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        except BaseException:
+            self._batch_depth -= 1
+            if self._conn is not None and self._conn.in_transaction:
+                self._conn.rollback()
+            self._batch_pending = 0
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._flush()
+
+    def _new_id(self, prefix: str) -> str:
+        """Unique row id; random suffix is sliced from a pooled urandom buffer (one syscall per 1024 ids)."""
+        pos = self._rand_pos
+        if pos + 4 > len(self._rand_buf):
+            self._rand_buf = os.urandom(ID_RANDOM_POOL_BYTES)
+            pos = 0
+        self._rand_pos = pos + 4
+        return f"{prefix}_{time.time_ns() // 1_000_000}_{self._rand_buf[pos:pos + 4].hex()}"
+
     def get_project_root(self) -> Path:
         return self._root
 
+    def get_project_root_str(self) -> str:
+        return self._root_str
+
+    def _sync_caches(self) -> None:
+        """Drop cached reads if another connection has committed since they were taken."""
+        version = self._connect().execute("PRAGMA data_version").fetchone()[0]
+        with self._cache_lock:
+            if version != self._cache_data_version:
+                self._task_cache.clear()
+                self._canonical_cached = None
+                self._cache_data_version = version
+
     def get_task(self, task_id: str) -> dict[str, Any] | None:
         """Internal: fetch task by id."""
-        conn = self._connect()
-        cur = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        row = cur.fetchone()
+        self._sync_caches()
+        with self._cache_lock:
+            d = self._task_cache.get(task_id)
+            if d is not None:
+                self._task_cache.move_to_end(task_id)
+                return {**d, "metadata": dict(d["metadata"])}
+        with self._read_cursor() as cur:
+            row = cur.execute(_SQL["task_by_id"], (task_id,)).fetchone()
         if not row:
             return None
-        d = dict(row)
-        d["metadata"] = json.loads(d.get("metadata") or "{}")
-        return d
+        d = dict(zip(_TASK_FIELDS, row))
+        d["metadata"] = _loads(d["metadata"], {})
+        with self._cache_lock:
+            self._task_cache[task_id] = d
+            if len(self._task_cache) > TASK_CACHE_SIZE:
+                self._task_cache.popitem(last=False)
+        return {**d, "metadata": dict(d["metadata"])}
 
     def get_last_state(self) -> dict[str, Any]:
         """
@@ -168,16 +528,14 @@ class Memory:
         Mandatory tool: get_last_state().
         """
         try:
-            conn = self._connect()
-            cur = conn.execute(
-                "SELECT * FROM context_snapshots ORDER BY created_at DESC LIMIT 1"
-            )
-            row = cur.fetchone()
+            with self._read_cursor() as cur:
+                row = cur.execute(_SQL["last_snapshot"]).fetchone()
+                active = cur.execute(_SQL["active_task"]).fetchone() if row else None
             if not row:
                 return _tool_result(
                     "success",
                     observations={
-                        "project_root": str(self._root),
+                        "project_root": self._root_str,
                         "has_snapshot": False,
                         "active_task": None,
                         "message": "No prior state; fresh session.",
@@ -185,23 +543,15 @@ class Memory:
                     next_recommended_action="Initialize task and take first snapshot.",
                 )
 
-            cur2 = conn.execute(
-                "SELECT * FROM tasks WHERE state NOT IN ('COMPLETED', 'ROLLBACK') ORDER BY updated_at DESC LIMIT 1"
-            )
-            active = cur2.fetchone()
-            snapshot = dict(row)
-            snapshot["project_map"] = json.loads(snapshot["project_map"] or "{}")
-            snapshot["safe_to_edit"] = json.loads(snapshot["safe_to_edit"] or "[]")
-            snapshot["do_not_touch"] = json.loads(snapshot["do_not_touch"] or "[]")
-            snapshot["metadata"] = json.loads(snapshot["metadata"] or "{}")
+            snapshot = _decode_snapshot(dict(zip(_SNAPSHOT_FIELDS, row)))
 
             return _tool_result(
                 "success",
                 observations={
-                    "project_root": str(self._root),
+                    "project_root": self._root_str,
                     "has_snapshot": True,
                     "last_snapshot": snapshot,
-                    "active_task": dict(active) if active else None,
+                    "active_task": dict(zip(_TASK_FIELDS, active)) if active else None,
                 },
                 next_recommended_action="Resume or create task; run verification if needed.",
             )
@@ -218,45 +568,34 @@ class Memory:
         Mandatory tool: get_canonical_state().
         """
         try:
-            conn = self._connect()
-            cur = conn.execute("SELECT snapshot_id, updated_at FROM canonical_state WHERE id = 1")
-            row = cur.fetchone()
+            self._sync_caches()
+            cached = self._canonical_cached
+            if cached is not None:
+                return self._canonical_result(*cached)
+            with self._read_cursor() as cur:
+                row = cur.execute(_SQL["canonical_snapshot"]).fetchone()
             if not row:
                 return _tool_result(
                     "success",
                     observations={
-                        "project_root": str(self._root),
+                        "project_root": self._root_str,
                         "has_canonical": False,
                         "message": "No canonical state set yet.",
                     },
                     next_recommended_action="Complete a verified run to set canonical state.",
                 )
 
-            snap_id = row["snapshot_id"]
-            cur2 = conn.execute("SELECT * FROM context_snapshots WHERE id = ?", (snap_id,))
-            snap_row = cur2.fetchone()
-            if not snap_row:
+            if row[0] is None:
                 return _tool_result(
                     "success",
                     observations={"has_canonical": False, "message": "Canonical snapshot missing."},
                 )
 
-            snap = dict(snap_row)
-            snap["project_map"] = json.loads(snap["project_map"] or "{}")
-            snap["safe_to_edit"] = json.loads(snap["safe_to_edit"] or "[]")
-            snap["do_not_touch"] = json.loads(snap["do_not_touch"] or "[]")
-            snap["metadata"] = json.loads(snap["metadata"] or "{}")
-
-            return _tool_result(
-                "success",
-                observations={
-                    "project_root": str(self._root),
-                    "has_canonical": True,
-                    "canonical_snapshot": snap,
-                    "canonical_updated_at": row["updated_at"],
-                },
-                next_recommended_action="Use for rollback or model handover.",
-            )
+            snap = _decode_snapshot(dict(zip(_SNAPSHOT_FIELDS, row)))
+            updated_at = row[len(_SNAPSHOT_FIELDS)]
+            with self._cache_lock:
+                self._canonical_cached = (snap, updated_at)
+            return self._canonical_result(snap, updated_at)
         except Exception as e:
             return _tool_result(
                 "failure",
@@ -264,19 +603,31 @@ class Memory:
                 next_recommended_action="Check database.",
             )
 
+    def _canonical_result(self, snap: dict[str, Any], updated_at: float) -> dict[str, Any]:
+        return _tool_result(
+            "success",
+            observations={
+                "project_root": self._root_str,
+                "has_canonical": True,
+                "canonical_snapshot": copy.deepcopy(snap),  # snap may be the cached object
+                "canonical_updated_at": updated_at,
+            },
+            next_recommended_action="Use for rollback or model handover.",
+        )
+
     def record_failure(self, reason: str, context: dict[str, Any]) -> dict[str, Any]:
         """
         Record a failed strategy/command to prevent repetition.
         Mandatory tool: record_failure(reason, context).
         """
         try:
-            fid = f"fail_{int(time.time() * 1000)}_{os.urandom(4).hex()}"
+            fid = self._new_id("fail")
             conn = self._connect()
             conn.execute(
-                "INSERT INTO failures (id, reason, context, created_at, task_id) VALUES (?, ?, ?, ?, ?)",
-                (fid, reason, json.dumps(context), time.time(), context.get("task_id")),
+                _SQL["insert_failure"],
+                (fid, reason, _dumps(context), time.time(), context.get("task_id")),
             )
-            conn.commit()
+            self._commit()
             return _tool_result(
                 "success",
                 observations={"failure_id": fid, "reason": reason},
@@ -295,9 +646,9 @@ class Memory:
         Mandatory tool: resume_task(task_id).
         """
         try:
-            conn = self._connect()
-            cur = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-            row = cur.fetchone()
+            with self._read_cursor() as cur:
+                row = cur.execute(_SQL["task_with_latest_snapshot"], (task_id,)).fetchone()
+                failure_rows = cur.execute(_SQL["task_failures"], (task_id, 20)).fetchall() if row else []
             if not row:
                 return _tool_result(
                     "failure",
@@ -305,28 +656,14 @@ class Memory:
                     next_recommended_action="List tasks or create a new one.",
                 )
 
-            task = dict(row)
-            task["metadata"] = json.loads(task["metadata"] or "{}")
-
-            cur2 = conn.execute(
-                "SELECT * FROM context_snapshots WHERE task_id = ? ORDER BY created_at DESC LIMIT 1",
-                (task_id,),
-            )
-            snap_row = cur2.fetchone()
+            n = len(_TASK_FIELDS)
+            task = dict(zip(_TASK_FIELDS, row[:n]))
+            task["metadata"] = _loads(task["metadata"], {})
             snapshot = None
-            if snap_row:
-                snapshot = dict(snap_row)
-                snapshot["project_map"] = json.loads(snapshot["project_map"] or "{}")
-                snapshot["safe_to_edit"] = json.loads(snapshot["safe_to_edit"] or "[]")
-                snapshot["do_not_touch"] = json.loads(snapshot["do_not_touch"] or "[]")
-
-            cur3 = conn.execute(
-                "SELECT id, reason, context, created_at FROM failures WHERE task_id = ? ORDER BY created_at DESC LIMIT 20",
-                (task_id,),
-            )
-            failures = [dict(r) for r in cur3.fetchall()]
-            for f in failures:
-                f["context"] = json.loads(f["context"])
+            if row[n] is not None:
+                snapshot = _decode_snapshot(dict(zip(_SNAPSHOT_FIELDS, row[n:])))
+
+            failures = [_failure_from_row(r) for r in failure_rows]
 
             return _tool_result(
                 "success",
@@ -355,17 +692,14 @@ class Memory:
         """Internal: create or update task."""
         conn = self._connect()
         now = time.time()
-        meta_json = json.dumps(metadata or {})
+        meta_json = _dumps(metadata or {})
         conn.execute(
-            """INSERT INTO tasks (id, parent_id, goal, state, created_at, updated_at, completed_at, metadata)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-               ON CONFLICT(id) DO UPDATE SET
-                 goal=excluded.goal, state=excluded.state, updated_at=excluded.updated_at,
-                 completed_at=CASE WHEN excluded.state IN ('COMPLETED','ROLLBACK') THEN excluded.updated_at ELSE completed_at END,
-                 metadata=excluded.metadata""",
+            _SQL["upsert_task"],
             (task_id, parent_id, goal, state, now, now, None if state not in ("COMPLETED", "ROLLBACK") else now, meta_json),
         )
-        conn.commit()
+        with self._cache_lock:
+            self._task_cache.pop(task_id, None)
+        self._commit()
 
     def save_snapshot(
         self,
@@ -378,30 +712,39 @@ class Memory:
     ) -> None:
         """Internal: save context snapshot."""
         conn = self._connect()
-        now = time.time()
         conn.execute(
-            """INSERT INTO context_snapshots (id, task_id, created_at, project_map, safe_to_edit, do_not_touch, metadata)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (
-                snapshot_id,
-                task_id,
-                now,
-                json.dumps(project_map),
-                json.dumps(safe_to_edit),
-                json.dumps(do_not_touch),
-                json.dumps(metadata or {}),
-            ),
+            _SQL["insert_snapshot"],
+            _snapshot_params(snapshot_id, task_id, project_map, safe_to_edit, do_not_touch, metadata),
         )
-        conn.commit()
+        self._commit()
+
+    def save_and_promote_snapshot(
+        self,
+        snapshot_id: str,
+        task_id: str,
+        project_map: dict[str, Any],
+        safe_to_edit: list[str],
+        do_not_touch: list[str],
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        """Save a snapshot and make it canonical in one transaction (verified-run flow)."""
+        params = _snapshot_params(snapshot_id, task_id, project_map, safe_to_edit, do_not_touch, metadata)
+        with self._transaction() as conn:
+            conn.execute(_SQL["insert_snapshot"], params)
+            conn.execute(_SQL["set_canonical"], (snapshot_id, params[2]))
+            with self._cache_lock:
+                self._canonical_cached = None
 
     def set_canonical_state(self, snapshot_id: str) -> None:
         """Internal: set the immutable canonical state to given snapshot."""
         conn = self._connect()
         conn.execute(
-            "INSERT OR REPLACE INTO canonical_state (id, snapshot_id, updated_at) VALUES (1, ?, ?)",
+            _SQL["set_canonical"],
             (snapshot_id, time.time()),
         )
-        conn.commit()
+        with self._cache_lock:
+            self._canonical_cached = None
+        self._commit()
 
     def record_tool_usage(
         self,
@@ -411,36 +754,67 @@ class Memory:
         task_id: str | None = None,
     ) -> None:
         """Internal: record successful tool usage."""
-        uid = f"tool_{int(time.time() * 1000)}_{os.urandom(4).hex()}"
+        uid = self._new_id("tool")
         conn = self._connect()
         conn.execute(
-            "INSERT INTO tool_usage (id, tool_name, arguments, outcome_summary, created_at, task_id) VALUES (?, ?, ?, ?, ?, ?)",
-            (uid, tool_name, json.dumps(arguments), outcome_summary, time.time(), task_id),
+            _SQL["insert_tool_usage"],
+            (uid, tool_name, _dumps(arguments), outcome_summary, time.time(), task_id),
         )
-        conn.commit()
+        self._commit()
+
+    def record_failures_batch(self, items: list[tuple[str, dict[str, Any]]]) -> list[str]:
+        """Internal: record many (reason, context) failures with one executemany and one commit."""
+        now = time.time()
+        rows = [
+            (self._new_id("fail"), reason, _dumps(context), now, context.get("task_id"))
+            for reason, context in items
+        ]
+        if rows:
+            with self._transaction() as conn:
+                conn.executemany(_SQL["insert_failure"], rows)
+        return [r[0] for r in rows]
+
+    def record_tool_usages_batch(
+        self, items: list[tuple[str, dict[str, Any], str, str | None]]
+    ) -> list[str]:
+        """Internal: record many (tool_name, arguments, outcome_summary, task_id) usages in one transaction."""
+        now = time.time()
+        rows = [
+            (self._new_id("tool"), tool_name, _dumps(arguments), outcome_summary, now, task_id)
+            for tool_name, arguments, outcome_summary, task_id in items
+        ]
+        if rows:
+            with self._transaction() as conn:
+                conn.executemany(_SQL["insert_tool_usage"], rows)
+        return [r[0] for r in rows]
 
     def get_failure_summary(self, task_id: str | None = None, limit: int = 50) -> list[dict]:
         """Return recent failures for handover package."""
-        conn = self._connect()
-        if task_id:
-            cur = conn.execute(
-                "SELECT id, reason, context, created_at FROM failures WHERE task_id = ? ORDER BY created_at DESC LIMIT ?",
-                (task_id, limit),
-            )
-        else:
-            cur = conn.execute(
-                "SELECT id, reason, context, created_at FROM failures ORDER BY created_at DESC LIMIT ?",
-                (limit,),
-            )
-        rows = cur.fetchall()
-        out = []
-        for r in rows:
-            d = dict(r)
-            d["context"] = json.loads(d["context"])
-            out.append(d)
-        return out
+        return list(self.iter_failures(task_id=task_id, limit=limit))
+
+    def iter_failures(self, task_id: str | None = None, limit: int = 50) -> Iterator[dict[str, Any]]:
+        """Yield recent failures newest-first, decoding FETCH_CHUNK_SIZE rows at a time."""
+        with self._read_cursor() as cur:
+            if task_id:
+                cur.execute(_SQL["task_failures"], (task_id, limit))
+            else:
+                cur.execute(_SQL["recent_failures"], (limit,))
+            while rows := cur.fetchmany(FETCH_CHUNK_SIZE):
+                for r in rows:
+                    yield _failure_from_row(r)
 
     def close(self) -> None:
+        with self._readers_lock:
+            # Idle readers close now; checked-out ones close when their cursor is released
+            while not self._read_pool.empty():
+                self._read_pool.get_nowait().close()
+            self._readers.clear()
+            self._pool_generation += 1
         if self._conn:
+            self._flush()
             self._conn.close()
             self._conn = None
+        with self._cache_lock:
+            self._task_cache.clear()
+            self._canonical_cached = None
+            self._cache_data_version = None
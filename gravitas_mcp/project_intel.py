@@ -7,7 +7,13 @@ optional future: dependency graph inference.
 
 from __future__ import annotations
 
+import copy
+import fnmatch
 import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -33,19 +39,105 @@ DEFAULT_IGNORE = {
     ".eggs",
     "*.egg-info",
     ".gravitas_brain.db",
+    ".gravitas_brain.db-wal",  # WAL sidecars, present while the DB is open
+    ".gravitas_brain.db-shm",
     ".DS_Store",
     "Thumbs.db",
 }
 
 
-def _should_ignore(name: str, ignore_set: set[str]) -> bool:
-    for skip in ignore_set:
-        if skip.startswith("*"):
-            if name.endswith(skip[1:]):
-                return True
-        elif name == skip or name.startswith(skip + os.sep):
-            return True
-    return False
+# (exact names, "*suffix" suffixes, one fused regex for any other glob entries or None)
+_IgnoreRules = tuple[frozenset[str], tuple[str, ...], "re.Pattern[str] | None"]
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+def _compile_ignore(ignore_set: set[str]) -> _IgnoreRules:
+    """
+    Split ignore entries into exact names, "*suffix" patterns (stored without the "*") and
+    general globs ("test_*", "*.py[co]"), the latter fused into a single fnmatch-style regex.
+    """
+    exact: set[str] = set()
+    suffixes: list[str] = []
+    globs: list[str] = []
+    for x in ignore_set:
+        if not _GLOB_CHARS.search(x):
+            exact.add(x)
+        elif x.startswith("*") and not _GLOB_CHARS.search(x, 1):
+            suffixes.append(x[1:])
+        else:
+            globs.append(x)
+    glob_re = re.compile("|".join(f"(?:{fnmatch.translate(g)})" for g in sorted(globs))) if globs else None
+    return frozenset(exact), tuple(suffixes), glob_re
+
+
+_DEFAULT_IGNORE_COMPILED = _compile_ignore(DEFAULT_IGNORE)
+
+PROJECT_MAP_CACHE_SIZE = 8
+
+# collect_structure(parallel=True) reads listings ahead on this many threads; scandir/stat release
+# the GIL. Only worth it where each stat is slow (network filesystems); on local disks the thread
+# handoff costs more than the walk.
+WALK_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_walk_executor: ThreadPoolExecutor | None = None
+_walk_executor_lock = threading.Lock()
+
+
+def _get_walk_executor() -> ThreadPoolExecutor:
+    global _walk_executor
+    with _walk_executor_lock:
+        if _walk_executor is None:
+            _walk_executor = ThreadPoolExecutor(max_workers=WALK_MAX_WORKERS, thread_name_prefix="gravitas-walk")
+        return _walk_executor
+
+# (root, max_depth, max_entries, ignore) -> ((path, st_mtime_ns) of every directory the walk listed,
+# successful get_project_map result). Results are never handed out directly, callers get copies.
+_PROJECT_MAP_CACHE: OrderedDict[tuple, tuple[tuple[tuple[str, int | None], ...], dict[str, Any]]] = OrderedDict()
+
+
+def _dir_mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _unchanged(dir_mtimes: tuple[tuple[str, int | None], ...]) -> bool:
+    """True if no walked directory gained, lost or renamed an entry (one stat each, no listing)."""
+    return all(_dir_mtime(path) == mtime for path, mtime in dir_mtimes)
+
+
+def _should_ignore(name: str, ignore: _IgnoreRules) -> bool:
+    exact, suffixes, glob_re = ignore
+    return name in exact or name.endswith(suffixes) or (glob_re is not None and glob_re.match(name) is not None)
+
+
+def _listing(path: str, ignore: _IgnoreRules) -> tuple[int | None, list[tuple[str, bool, str]] | None]:
+    """
+    (st_mtime_ns taken before reading, non-ignored children of path as (name, is_file, path)):
+    directories first, then files, each by case-insensitive name. Children are None if the
+    directory can't be read.
+    """
+    mtime = _dir_mtime(path)
+    dirs: list[tuple[str, bool, str]] = []
+    files: list[tuple[str, bool, str]] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                if _should_ignore(name, ignore):
+                    continue
+                try:
+                    is_file = entry.is_file()  # follows symlinks, like Path.is_file
+                except OSError:
+                    is_file = False
+                (files if is_file else dirs).append((name, is_file, entry.path))
+    except OSError:
+        return mtime, None
+    dirs.sort(key=lambda e: e[0].lower())
+    files.sort(key=lambda e: e[0].lower())
+    dirs.extend(files)
+    return mtime, dirs
 
 
 def collect_structure(
@@ -53,42 +145,73 @@ def collect_structure(
     max_depth: int = 8,
     max_entries: int = 2000,
     ignore: set[str] | None = None,
+    parallel: bool = False,
+    dir_mtimes: list[tuple[str, int | None]] | None = None,
 ) -> dict[str, Any]:
     """
     Recursive project structure as nested dict.
     Keys are relative paths; values are either "FILE" or a dict of children.
+    With parallel, sibling directories are listed ahead on a shared thread pool (for high-latency
+    filesystems); the result is identical. dir_mtimes, if given, receives (path, st_mtime_ns) of
+    every directory whose listing went into the result.
     """
     root = Path(root).resolve()
-    ignore_set = ignore or DEFAULT_IGNORE
+    ignore_rules = _compile_ignore(ignore) if ignore else _DEFAULT_IGNORE_COMPILED
     result: dict[str, Any] = {}
-    count = [0]
-
-    def walk(dir_path: Path, rel_prefix: str, depth: int) -> dict[str, Any]:
-        if depth > max_depth or count[0] >= max_entries:
-            return {}
-        node: dict[str, Any] = {}
-        try:
-            entries = sorted(dir_path.iterdir(), key=lambda p: (p.is_file(), p.name.lower()))
-        except OSError:
-            return {}
-        for p in entries:
-            if count[0] >= max_entries:
-                break
-            name = p.name
-            if _should_ignore(name, ignore_set):
-                continue
-            rel = f"{rel_prefix}{name}" if rel_prefix else name
-            if p.is_file():
-                node[name] = "FILE"
-                count[0] += 1
-            else:
-                child = walk(p, rel + os.sep, depth + 1)
-                node[name] = child if child else "DIR"
-                count[0] += 1
-        return node
-
-    result[""] = walk(root, "", 0)
-    result["_meta"] = {"root": str(root), "max_depth": max_depth, "entries_count": count[0]}
+    count = 0
+    executor = _get_walk_executor() if parallel else None
+    # path -> listing being read ahead; a frame's subdirectories are submitted when it is pushed
+    ahead: dict[str, Future] = {}
+
+    def read_ahead(entries: list[tuple[str, bool, str]], depth: int) -> None:
+        if executor is not None and depth + 1 <= max_depth:
+            for _, is_file, path in entries:
+                if not is_file:
+                    ahead[path] = executor.submit(_listing, path, ignore_rules)
+
+    # Depth-first walk on an explicit stack. A directory entry is counted after its subtree,
+    # and each level stops taking entries once max_entries is reached.
+    def list_dir(path: str, future: Future | None = None) -> list[tuple[str, bool, str]] | None:
+        mtime, children = future.result() if future is not None else _listing(path, ignore_rules)
+        if dir_mtimes is not None:
+            dir_mtimes.append((path, mtime))
+        return children
+
+    top: dict[str, Any] = {}
+    listing = list_dir(str(root)) if max_depth >= 0 and max_entries > 0 else None
+    # frame: [entries, next index, node, depth, name of the child dir being walked]
+    stack: list[list[Any]] = [[listing, 0, top, 0, None]] if listing else []
+    if listing:
+        read_ahead(listing, 0)
+    while stack:
+        frame = stack[-1]
+        entries, i, node, depth, _ = frame
+        if i >= len(entries) or count >= max_entries:
+            stack.pop()
+            if stack:
+                parent = stack[-1]
+                parent[2][parent[4]] = node or "DIR"
+                count += 1
+            continue
+        name, is_file, path = entries[i]
+        frame[1] = i + 1
+        if is_file:
+            node[name] = "FILE"
+            count += 1
+            continue
+        child = list_dir(path, ahead.pop(path, None)) if depth + 1 <= max_depth else None
+        if child:
+            frame[4] = name
+            stack.append([child, 0, {}, depth + 1, None])
+            read_ahead(child, depth + 1)
+        else:
+            node[name] = "DIR"
+            count += 1
+
+    for fut in ahead.values():
+        fut.cancel()  # read ahead past max_entries; dropped
+    result[""] = top
+    result["_meta"] = {"root": str(root), "max_depth": max_depth, "entries_count": count}
     return result
 
 
@@ -108,9 +231,17 @@ def get_project_map(
             errors=[f"Not a directory: {root}"],
             next_recommended_action="Set project_root to a valid directory.",
         )
+    key = (str(root), max_depth, max_entries, frozenset(ignore or DEFAULT_IGNORE))
+    cached = _PROJECT_MAP_CACHE.get(key)
+    if cached is not None and _unchanged(cached[0]):
+        _PROJECT_MAP_CACHE.move_to_end(key)
+        return copy.deepcopy(cached[1])
+    dir_mtimes: list[tuple[str, int | None]] = []
     try:
-        structure = collect_structure(root, max_depth=max_depth, max_entries=max_entries, ignore=ignore)
-        return _tool_result(
+        structure = collect_structure(
+            root, max_depth=max_depth, max_entries=max_entries, ignore=ignore, dir_mtimes=dir_mtimes
+        )
+        result = _tool_result(
             "success",
             observations={
                 "project_root": str(root),
@@ -125,3 +256,8 @@ def get_project_map(
             errors=[str(e)],
             next_recommended_action="Check path and permissions.",
         )
+    _PROJECT_MAP_CACHE[key] = (tuple(dir_mtimes), copy.deepcopy(result))
+    _PROJECT_MAP_CACHE.move_to_end(key)
+    if len(_PROJECT_MAP_CACHE) > PROJECT_MAP_CACHE_SIZE:
+        _PROJECT_MAP_CACHE.popitem(last=False)
+    return result
@@ -8,18 +8,25 @@ and Model Resume Package (handover) for model swap / restart / crash recovery.
 from __future__ import annotations
 
 import anyio
+import inspect
 import json
 import os
+from operator import itemgetter
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+try:  # optional C-accelerated JSON for tool responses; stdlib json otherwise
+    import orjson
+except ImportError:
+    orjson = None
 
 from mcp import types
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 
-from .browser import BrowserEngine
+from .browser import DEFAULT_SESSION, BrowserEngine
 from .controller import Controller
-from .memory import Memory
+from .memory import Memory, _tool_result
 from .project_intel import get_project_map
 from .terminal import TerminalEngine
 
@@ -33,6 +40,16 @@ def _detect_project_root() -> Path:
     return cwd
 
 
+def _dumps(result: Any) -> str:
+    """Encode a tool result; anything non-JSON-native falls back to str()."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(result, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits never reach default=
+    return json.dumps(result, default=str)
+
+
 def _content(text: str) -> list[types.ContentBlock]:
     return [types.TextContent(type="text", text=text)]
 
@@ -41,207 +58,330 @@ def _content(text: str) -> list[types.ContentBlock]:
 root = _detect_project_root()
 memory = Memory(project_root=root)
 controller = Controller(memory=memory)
-terminal = TerminalEngine(project_root=root)
+terminal = TerminalEngine(
+    project_root=root,
+    trusted=os.environ.get("GRAVITAS_TERMINAL_TRUSTED", "").lower() in ("1", "true", "yes"),
+)
 browser = BrowserEngine(project_root=root)
 
 # MCP Server Definition
 app = Server("Gravitas-Core-MCP")
 
 
-@app.list_tools()
-async def list_tools() -> list[types.Tool]:
-    print("Listing tools...")
-    return [
-        types.Tool(
-            name="get_last_state",
-            description="Return the last known state (most recent snapshot + active task). Authoritative memory.",
-            inputSchema={"type": "object", "properties": {}},
-        ),
-        types.Tool(
-            name="get_canonical_state",
-            description="Return the last verified, immutable working state for rollback/recovery.",
-            inputSchema={"type": "object", "properties": {}},
-        ),
-        types.Tool(
-            name="record_failure",
-            description="Record a failed strategy/command to prevent repetition.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "reason": {"type": "string", "description": "Failure reason"},
-                    "context": {"type": "object", "description": "Context (e.g. task_id, command)"},
-                },
-                "required": ["reason", "context"],
-            },
-        ),
-        types.Tool(
-            name="resume_task",
-            description="Load task and its context for resumption (model handover/restart).",
-            inputSchema={
-                "type": "object",
-                "properties": {"task_id": {"type": "string", "description": "Task ID"}},
-                "required": ["task_id"],
-            },
-        ),
-        types.Tool(
-            name="controller_create_task",
-            description="Create a new task and set state to PLANNING.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "goal": {"type": "string", "description": "Task goal"},
-                    "task_id": {"type": "string", "description": "Optional task ID"},
-                },
-                "required": ["goal"],
+# Optional on every browser tool; calls with different sessions get separate pages and run in parallel
+_BROWSER_SESSION = {"type": "string", "description": "Browser session id (default: shared 'default' page)"}
+
+# Tool schemas are static; build them once instead of on every list_tools request
+_TOOLS: list[types.Tool] = [
+    types.Tool(
+        name="get_last_state",
+        description="Return the last known state (most recent snapshot + active task). Authoritative memory.",
+        inputSchema={"type": "object", "properties": {}},
+    ),
+    types.Tool(
+        name="get_canonical_state",
+        description="Return the last verified, immutable working state for rollback/recovery.",
+        inputSchema={"type": "object", "properties": {}},
+    ),
+    types.Tool(
+        name="record_failure",
+        description="Record a failed strategy/command to prevent repetition.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "reason": {"type": "string", "description": "Failure reason"},
+                "context": {"type": "object", "description": "Context (e.g. task_id, command)"},
             },
-        ),
-        types.Tool(
-            name="controller_transition",
-            description="Transition task to a new state (PLANNING, CODING, EXECUTING, VERIFYING, FAILED_RETRY, ROLLBACK, COMPLETED).",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "task_id": {"type": "string"},
-                    "new_state": {"type": "string"},
-                },
-                "required": ["task_id", "new_state"],
+            "required": ["reason", "context"],
+        },
+    ),
+    types.Tool(
+        name="resume_task",
+        description="Load task and its context for resumption (model handover/restart).",
+        inputSchema={
+            "type": "object",
+            "properties": {"task_id": {"type": "string", "description": "Task ID"}},
+            "required": ["task_id"],
+        },
+    ),
+    types.Tool(
+        name="controller_create_task",
+        description="Create a new task and set state to PLANNING.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "goal": {"type": "string", "description": "Task goal"},
+                "task_id": {"type": "string", "description": "Optional task ID"},
             },
-        ),
-        types.Tool(
-            name="controller_record_step_failure",
-            description="Record a step failure; may trigger FAILED_RETRY or ROLLBACK.",
-            inputSchema={
-                "type": "object",
-                "properties": {"task_id": {"type": "string"}, "reason": {"type": "string"}},
-                "required": ["task_id", "reason"],
+            "required": ["goal"],
+        },
+    ),
+    types.Tool(
+        name="controller_transition",
+        description="Transition task to a new state (PLANNING, CODING, EXECUTING, VERIFYING, FAILED_RETRY, ROLLBACK, COMPLETED).",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "task_id": {"type": "string"},
+                "new_state": {"type": "string"},
             },
-        ),
-        types.Tool(
-            name="controller_get_state",
-            description="Return current task state and policy info.",
-            inputSchema={
-                "type": "object",
-                "properties": {"task_id": {"type": "string"}},
-                "required": ["task_id"],
+            "required": ["task_id", "new_state"],
+        },
+    ),
+    types.Tool(
+        name="controller_record_step_failure",
+        description="Record a step failure; may trigger FAILED_RETRY or ROLLBACK.",
+        inputSchema={
+            "type": "object",
+            "properties": {"task_id": {"type": "string"}, "reason": {"type": "string"}},
+            "required": ["task_id", "reason"],
+        },
+    ),
+    types.Tool(
+        name="controller_get_state",
+        description="Return current task state and policy info.",
+        inputSchema={
+            "type": "object",
+            "properties": {"task_id": {"type": "string"}},
+            "required": ["task_id"],
+        },
+    ),
+    types.Tool(
+        name="terminal_execute",
+        description="Execute a shell command with timeout and cwd. Returns stdout, stderr, exit_code.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "command": {"type": "string"},
+                "cwd": {"type": "string"},
+                "timeout_sec": {"type": "integer"},
             },
-        ),
-        types.Tool(
-            name="terminal_execute",
-            description="Execute a shell command with timeout and cwd. Returns stdout, stderr, exit_code.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "command": {"type": "string"},
-                    "cwd": {"type": "string"},
-                    "timeout_sec": {"type": "integer"},
-                },
-                "required": ["command"],
+            "required": ["command"],
+        },
+    ),
+    types.Tool(
+        name="terminal_start_background",
+        description="Start a background process; use process_id to stop later.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "command": {"type": "string"},
+                "process_id": {"type": "string"},
+                "cwd": {"type": "string"},
             },
-        ),
-        types.Tool(
-            name="terminal_start_background",
-            description="Start a background process; use process_id to stop later.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "command": {"type": "string"},
-                    "process_id": {"type": "string"},
-                    "cwd": {"type": "string"},
+            "required": ["command", "process_id"],
+        },
+    ),
+    types.Tool(
+        name="terminal_stop_background",
+        description="Terminate a background process by process_id.",
+        inputSchema={
+            "type": "object",
+            "properties": {"process_id": {"type": "string"}},
+            "required": ["process_id"],
+        },
+    ),
+    types.Tool(
+        name="terminal_list_background",
+        description="List active background process ids.",
+        inputSchema={"type": "object", "properties": {}},
+    ),
+    types.Tool(
+        name="browser_navigate",
+        description="Navigate to URL (Playwright).",
+        inputSchema={
+            "type": "object",
+            "properties": {"url": {"type": "string"}, "wait_until": {"type": "string"}, "session": _BROWSER_SESSION},
+            "required": ["url"],
+        },
+    ),
+    types.Tool(
+        name="browser_snapshot",
+        description="Capture DOM accessibility tree (CDP AXNode list on Chromium, see accessibility_format) and console errors.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Re-read the tree even if the page looks unchanged (e.g. after typing into an input)",
                 },
-                "required": ["command", "process_id"],
-            },
-        ),
-        types.Tool(
-            name="terminal_stop_background",
-            description="Terminate a background process by process_id.",
-            inputSchema={
-                "type": "object",
-                "properties": {"process_id": {"type": "string"}},
-                "required": ["process_id"],
-            },
-        ),
-        types.Tool(
-            name="terminal_list_background",
-            description="List active background process ids.",
-            inputSchema={"type": "object", "properties": {}},
-        ),
-        types.Tool(
-            name="browser_navigate",
-            description="Navigate to URL (Playwright).",
-            inputSchema={
-                "type": "object",
-                "properties": {"url": {"type": "string"}, "wait_until": {"type": "string"}},
-                "required": ["url"],
+                "session": _BROWSER_SESSION,
             },
-        ),
-        types.Tool(
-            name="browser_snapshot",
-            description="Capture DOM accessibility tree and console errors.",
-            inputSchema={"type": "object", "properties": {}},
-        ),
-        types.Tool(
-            name="browser_screenshot",
-            description="Take screenshot; optional path to save file.",
-            inputSchema={
-                "type": "object",
-                "properties": {"path": {"type": "string"}},
-            },
-        ),
-        types.Tool(
-            name="browser_get_console_errors",
-            description="Return collected JS console errors since last navigate.",
-            inputSchema={"type": "object", "properties": {}},
-        ),
-        types.Tool(
-            name="browser_hover",
-            description="Hover over an element by CSS selector.",
-            inputSchema={
-                "type": "object",
-                "properties": {"selector": {"type": "string", "description": "CSS selector for element"}},
-                "required": ["selector"],
-            },
-        ),
-        types.Tool(
-            name="project_get_map",
-            description="Recursive project structure with noise filtering.",
-            inputSchema={
-                "type": "object",
-                "properties": {"project_root": {"type": "string"}, "max_depth": {"type": "integer"}, "max_entries": {"type": "integer"}},
-            },
-        ),
-        types.Tool(
-            name="memory_save_snapshot",
-            description="Save a context snapshot for current task (internal use).",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "snapshot_id": {"type": "string"},
-                    "task_id": {"type": "string"},
-                    "project_map": {"type": "object"},
-                    "safe_to_edit": {"type": "array", "items": {"type": "string"}},
-                    "do_not_touch": {"type": "array", "items": {"type": "string"}},
-                },
-                "required": ["snapshot_id", "task_id", "project_map", "safe_to_edit", "do_not_touch"],
+        },
+    ),
+    types.Tool(
+        name="browser_screenshot",
+        description="Take screenshot; optional path to save file.",
+        inputSchema={
+            "type": "object",
+            "properties": {"path": {"type": "string"}, "session": _BROWSER_SESSION},
+        },
+    ),
+    types.Tool(
+        name="browser_get_console_errors",
+        description="Return collected JS console errors since last navigate.",
+        inputSchema={"type": "object", "properties": {"session": _BROWSER_SESSION}},
+    ),
+    types.Tool(
+        name="browser_hover",
+        description="Hover over an element by CSS selector.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "selector": {"type": "string", "description": "CSS selector for element"},
+                "session": _BROWSER_SESSION,
             },
-        ),
-        types.Tool(
-            name="memory_set_canonical",
-            description="Set the canonical (immutable) state to a snapshot (after verification).",
-            inputSchema={
-                "type": "object",
-                "properties": {"snapshot_id": {"type": "string"}},
-                "required": ["snapshot_id"],
+            "required": ["selector"],
+        },
+    ),
+    types.Tool(
+        name="browser_hover_many",
+        description="Dispatch hover events to several CSS selectors in one round trip (JS handlers only; no CSS :hover).",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "selectors": {"type": "array", "items": {"type": "string"}, "description": "CSS selectors"},
+                "session": _BROWSER_SESSION,
             },
-        ),
-        types.Tool(
-            name="get_model_resume_package",
-            description="Generate Model Resume Package for model swap/editor restart/crash recovery: goal, task, constraints, failures, safe/do-not-touch files.",
-            inputSchema={
-                "type": "object",
-                "properties": {"task_id": {"type": "string"}},
+            "required": ["selectors"],
+        },
+    ),
+    types.Tool(
+        name="browser_close_session",
+        description="Close a browser session's page and release its context back to the pool.",
+        inputSchema={"type": "object", "properties": {"session": _BROWSER_SESSION}},
+    ),
+    types.Tool(
+        name="project_get_map",
+        description="Recursive project structure with noise filtering.",
+        inputSchema={
+            "type": "object",
+            "properties": {"project_root": {"type": "string"}, "max_depth": {"type": "integer"}, "max_entries": {"type": "integer"}},
+        },
+    ),
+    types.Tool(
+        name="memory_save_snapshot",
+        description="Save a context snapshot for current task (internal use). Set promote=true to also make it canonical atomically.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "snapshot_id": {"type": "string"},
+                "task_id": {"type": "string"},
+                "project_map": {"type": "object"},
+                "safe_to_edit": {"type": "array", "items": {"type": "string"}},
+                "do_not_touch": {"type": "array", "items": {"type": "string"}},
+                "promote": {"type": "boolean", "default": False},
             },
-        ),
-    ]
+            "required": ["snapshot_id", "task_id", "project_map", "safe_to_edit", "do_not_touch"],
+        },
+    ),
+    types.Tool(
+        name="memory_set_canonical",
+        description="Set the canonical (immutable) state to a snapshot (after verification).",
+        inputSchema={
+            "type": "object",
+            "properties": {"snapshot_id": {"type": "string"}},
+            "required": ["snapshot_id"],
+        },
+    ),
+    types.Tool(
+        name="get_model_resume_package",
+        description="Generate Model Resume Package for model swap/editor restart/crash recovery: goal, task, constraints, failures, safe/do-not-touch files.",
+        inputSchema={
+            "type": "object",
+            "properties": {"task_id": {"type": "string"}},
+        },
+    ),
+]
+
+
+@app.list_tools()
+async def list_tools() -> list[types.Tool]:
+    print("Listing tools...")
+    return _TOOLS
+
+
+def _save_snapshot(args: dict[str, Any]) -> dict[str, Any]:
+    promote = args.get("promote", False)
+    save = memory.save_and_promote_snapshot if promote else memory.save_snapshot
+    save(
+        snapshot_id=args.get("snapshot_id", ""),
+        task_id=args.get("task_id", ""),
+        project_map=args.get("project_map") or {},
+        safe_to_edit=args.get("safe_to_edit") or [],
+        do_not_touch=args.get("do_not_touch") or [],
+    )
+    return _tool_result(
+        "success",
+        next_recommended_action="Snapshot saved and canonical state set." if promote else "Proceed.",
+    )
+
+
+def _set_canonical(args: dict[str, Any]) -> dict[str, Any]:
+    memory.set_canonical_state(args.get("snapshot_id", ""))
+    return _tool_result("success", next_recommended_action="Canonical state set.")
+
+
+# Tool name -> handler(args). Handlers return a result dict, or an awaitable of one for async engines.
+_HANDLERS: dict[str, Callable[[dict[str, Any]], Any]] = {
+    "get_last_state": lambda args: memory.get_last_state(),
+    "get_canonical_state": lambda args: memory.get_canonical_state(),
+    "record_failure": lambda args: memory.record_failure(
+        reason=args.get("reason", ""),
+        context=args.get("context") or {},
+    ),
+    "resume_task": lambda args: memory.resume_task(args.get("task_id", "")),
+    "controller_create_task": lambda args: controller.create_task(goal=args.get("goal", ""), task_id=args.get("task_id")),
+    "controller_transition": lambda args: controller.transition(
+        task_id=args.get("task_id", ""),
+        new_state=args.get("new_state", ""),
+    ),
+    "controller_record_step_failure": lambda args: controller.record_step_failure(
+        task_id=args.get("task_id", ""),
+        reason=args.get("reason", ""),
+    ),
+    "controller_get_state": lambda args: controller.get_state(args.get("task_id", "")),
+    "terminal_execute": lambda args: terminal.execute(
+        command=args.get("command", ""),
+        cwd=args.get("cwd"),
+        timeout_sec=args.get("timeout_sec"),
+    ),
+    "terminal_start_background": lambda args: terminal.start_background(
+        command=args.get("command", ""),
+        process_id=args.get("process_id", ""),
+        cwd=args.get("cwd"),
+    ),
+    "terminal_stop_background": lambda args: terminal.stop_background(args.get("process_id", "")),
+    "terminal_list_background": lambda args: terminal.list_background(),
+    "browser_navigate": lambda args: browser.navigate(
+        url=args.get("url", ""),
+        wait_until=args.get("wait_until", "domcontentloaded"),
+        session=args.get("session") or DEFAULT_SESSION,
+    ),
+    "browser_snapshot": lambda args: browser.snapshot(
+        session=args.get("session") or DEFAULT_SESSION,
+        refresh=bool(args.get("refresh", False)),
+    ),
+    "browser_screenshot": lambda args: browser.screenshot(
+        path=args.get("path"),
+        session=args.get("session") or DEFAULT_SESSION,
+    ),
+    "browser_get_console_errors": lambda args: browser.get_console_errors(session=args.get("session") or DEFAULT_SESSION),
+    "browser_hover": lambda args: browser.hover(args.get("selector", ""), session=args.get("session") or DEFAULT_SESSION),
+    "browser_hover_many": lambda args: browser.hover_many(
+        args.get("selectors") or [],
+        session=args.get("session") or DEFAULT_SESSION,
+    ),
+    "browser_close_session": lambda args: browser.close_session(args.get("session") or DEFAULT_SESSION),
+    "project_get_map": lambda args: get_project_map(
+        project_root=args.get("project_root") or root,
+        max_depth=args.get("max_depth", 8),
+        max_entries=args.get("max_entries", 2000),
+    ),
+    "memory_save_snapshot": _save_snapshot,
+    "memory_set_canonical": _set_canonical,
+    "get_model_resume_package": lambda args: _build_model_resume_package(memory, controller, args.get("task_id")),
+}
 
 
 @app.call_tool()
@@ -250,96 +390,27 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[types.ContentB
     print(f"Tool called: {name} with arguments: {args}")
     result: dict[str, Any]
     try:
-        if name == "get_last_state":
-            result = memory.get_last_state()
-        elif name == "get_canonical_state":
-            result = memory.get_canonical_state()
-        elif name == "record_failure":
-            result = memory.record_failure(
-                reason=args.get("reason", ""),
-                context=args.get("context") or {},
-            )
-        elif name == "resume_task":
-            result = memory.resume_task(args.get("task_id", ""))
-        elif name == "controller_create_task":
-            result = controller.create_task(goal=args.get("goal", ""), task_id=args.get("task_id"))
-        elif name == "controller_transition":
-            result = controller.transition(
-                task_id=args.get("task_id", ""),
-                new_state=args.get("new_state", ""),
-            )
-        elif name == "controller_record_step_failure":
-            result = controller.record_step_failure(
-                task_id=args.get("task_id", ""),
-                reason=args.get("reason", ""),
-            )
-        elif name == "controller_get_state":
-            result = controller.get_state(args.get("task_id", ""))
-        elif name == "terminal_execute":
-            result = await terminal.execute(
-                command=args.get("command", ""),
-                cwd=args.get("cwd"),
-                timeout_sec=args.get("timeout_sec"),
-            )
-        elif name == "terminal_start_background":
-            result = await terminal.start_background(
-                command=args.get("command", ""),
-                process_id=args.get("process_id", ""),
-                cwd=args.get("cwd"),
-            )
-        elif name == "terminal_stop_background":
-            result = await terminal.stop_background(args.get("process_id", ""))
-        elif name == "terminal_list_background":
-            result = await terminal.list_background()
-        elif name == "browser_navigate":
-            result = await browser.navigate(
-                url=args.get("url", ""),
-                wait_until=args.get("wait_until", "domcontentloaded"),
-            )
-        elif name == "browser_snapshot":
-            result = await browser.snapshot()
-        elif name == "browser_screenshot":
-            result = await browser.screenshot(path=args.get("path"))
-        elif name == "browser_get_console_errors":
-            result = await browser.get_console_errors()
-        elif name == "browser_hover":
-            result = await browser.hover(args.get("selector", ""))
-        elif name == "project_get_map":
-            result = get_project_map(
-                project_root=args.get("project_root") or root,
-                max_depth=args.get("max_depth", 8),
-                max_entries=args.get("max_entries", 2000),
-            )
-        elif name == "memory_save_snapshot":
-            memory.save_snapshot(
-                snapshot_id=args.get("snapshot_id", ""),
-                task_id=args.get("task_id", ""),
-                project_map=args.get("project_map") or {},
-                safe_to_edit=args.get("safe_to_edit") or [],
-                do_not_touch=args.get("do_not_touch") or [],
-            )
-            result = {"status": "success", "observations": {}, "errors": [], "next_recommended_action": "Proceed."}
-        elif name == "memory_set_canonical":
-            memory.set_canonical_state(args.get("snapshot_id", ""))
-            result = {"status": "success", "observations": {}, "errors": [], "next_recommended_action": "Canonical state set."}
-        elif name == "get_model_resume_package":
-            result = _build_model_resume_package(memory, controller, args.get("task_id"))
-        else:
+        handler = _HANDLERS.get(name)
+        if handler is None:
             result = {"status": "error", "message": f"Unknown tool: {name}"}
-        return _content(json.dumps(result, default=str))
+        else:
+            result = handler(args)
+            if inspect.isawaitable(result):
+                result = await result
+        return _content(_dumps(result))
     except Exception as e:
-        return _content(json.dumps({"status": "error", "message": str(e)}))
+        return _content(_dumps({"status": "error", "message": str(e)}))
 
 
 async def run_stdio():
     """Run via standard I/O (local)."""
+    init_opts = app.create_initialization_options()
     async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+        await app.run(read_stream, write_stream, init_opts)
 
 
-def _tool_result(status: str, observations: dict | None = None, errors: list | None = None, next_recommended_action: str = "") -> dict:
-    from .memory import _tool_result as tr
-    return tr(status, observations, errors, next_recommended_action)
+# Failure rows from Memory always carry both keys
+_reason_context = itemgetter("reason", "context")
 
 
 def _build_model_resume_package(memory: Memory, controller: Controller, task_id: str | None) -> dict[str, Any]:
@@ -372,8 +443,8 @@ def _build_model_resume_package(memory: Memory, controller: Controller, task_id:
                 "safe_to_edit": safe_to_edit,
                 "do_not_touch": do_not_touch,
             },
-            "failure_memory_summary": [{"reason": f.get("reason"), "context": f.get("context")} for f in failures],
-            "project_root": str(memory.get_project_root()),
+            "failure_memory_summary": [{"reason": r, "context": c} for r, c in map(_reason_context, failures)],
+            "project_root": memory.get_project_root_str(),
         },
         "errors": [],
         "next_recommended_action": "Resume task from state; avoid repeating failures; respect safe_to_edit and do_not_touch.",
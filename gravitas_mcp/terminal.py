@@ -13,13 +13,154 @@ import os
 import re
 import signal
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
+try:  # optional SIMD multi-pattern matcher for the denylist; fused re pattern otherwise
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 from .memory import _tool_result
 
 DEFAULT_TIMEOUT_SEC = 60
 MAX_OUTPUT_BYTES = 512 * 1024  # 512 KiB
+RESOLVED_CWD_CACHE_SIZE = 128
+READ_CHUNK_BYTES = 64 * 1024
+STOP_GRACE_SEC = 5.0  # stop_background: SIGTERM, then SIGKILL after this long
+TIMEOUT_KILL_GRACE_SEC = 1.0  # timed-out execute: same, with a shorter grace
+GROUP_POLL_SEC = 0.05  # how often _stop_tree checks whether the process group is gone
+
+# Children get their own session (POSIX) so the whole shell tree can be signalled as one group
+_NEW_SESSION = os.name == "posix"
+
+DEFAULT_DENYLIST = (
+    r"\brm\s+-rf\s+/",
+    r"\brm\s+-rf\s+\*",
+    r">\s*/dev/sd",
+    r"mkfs\.|dd\s+if=.*of=/dev",
+    r"chmod\s+-R\s+777",
+    r":(){ :|:& };:",  # fork bomb
+)
+
+# With the default denylist, a command led by one of these, free of shell metacharacters and not
+# mentioning any denylist keyword skips the regex sweep. Heads like git can delete files themselves
+# ("git rm -rf *"), so a keyword anywhere in the command always sends it through the full check.
+_SAFE_HEADS = frozenset({"ls", "cat", "echo", "git", "python", "pytest", "pip", "node", "npm", "cargo"})
+_DENY_KEYWORDS = re.compile(r"rm|mkfs|dd|chmod|/dev/")
+# Group references (\1, (?P=name), (?(1)...)) would be renumbered or collide once patterns are fused
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+# (?i) etc. apply to the whole expression; once fused they would leak into every other pattern
+# (Python 3.10 only warns about a non-leading one), so such patterns are never fused
+_INLINE_GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+_SHELL_METACHARS = re.compile(r"[|&;<>$`\\\n\r(){}'\"!]")
+
+
+async def _drain(stream: asyncio.StreamReader, cap: int) -> bytes:
+    """Read stream to EOF keeping at most cap bytes; the rest is discarded so the child never blocks on a full pipe."""
+    buf = bytearray()
+    while chunk := await stream.read(READ_CHUNK_BYTES):
+        room = cap - len(buf)
+        if room > 0:
+            buf += chunk[:room]
+    return bytes(buf)
+
+
+def _signal_tree(proc: asyncio.subprocess.Process, force: bool) -> None:
+    """SIGTERM (or SIGKILL if force) the process group led by proc; just proc where groups don't exist."""
+    try:
+        if _NEW_SESSION:
+            if _owns_group(proc):
+                os.killpg(proc.pid, signal.SIGKILL if force else signal.SIGTERM)
+        elif force:
+            proc.kill()
+        else:
+            proc.terminate()
+    except ProcessLookupError:
+        pass
+
+
+def _owns_group(proc: asyncio.subprocess.Process) -> bool:
+    """
+    Whether proc.pid still names proc's process group. Once the leader is reaped its pid can be
+    recycled; a live process with that pid leading its own group is someone else's group.
+    """
+    if proc.returncode is None:
+        return True
+    try:
+        return os.getpgid(proc.pid) != proc.pid
+    except ProcessLookupError:
+        return True  # no process has the pid, so a group by that id can only be what is left of ours
+
+
+def _group_alive(pgid: int) -> bool:
+    try:
+        os.killpg(pgid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+async def _stop_tree(proc: asyncio.subprocess.Process, grace: float) -> None:
+    """Ask the process tree to exit, escalating to SIGKILL for whatever is still running after grace seconds."""
+    _signal_tree(proc, force=False)
+    if not _NEW_SESSION:
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=grace)
+        except asyncio.TimeoutError:
+            _signal_tree(proc, force=True)
+            await proc.wait()
+        return
+    # The leader is usually sh, which exits on SIGTERM at once; wait on the whole group so
+    # children get the full grace period to run their own SIGTERM handlers.
+    deadline = time.monotonic() + grace
+    while time.monotonic() < deadline and _owns_group(proc) and _group_alive(proc.pid):
+        await asyncio.sleep(GROUP_POLL_SEC)
+    _signal_tree(proc, force=True)
+    await proc.wait()
+
+
+def _resolve_and_check(path: str | Path) -> tuple[Path, bool]:
+    resolved = Path(path).resolve()
+    return resolved, resolved.is_dir()
+
+
+def _fuse_patterns(patterns: list[re.Pattern[str]]) -> re.Pattern[str] | None:
+    """
+    One alternation over all patterns so a command is scanned once; group d<i> is patterns[i].
+    None if they can't be combined (inline global flags, group references), callers then test them one by one.
+    """
+    if not patterns or any(
+        _GROUP_REFERENCE.search(p.pattern) or _INLINE_GLOBAL_FLAGS.search(p.pattern) for p in patterns
+    ):
+        return None
+    try:
+        return re.compile("|".join(f"(?P<d{i}>{p.pattern})" for i, p in enumerate(patterns)))
+    except re.error:
+        return None
+
+
+def _compile_hyperscan(patterns: list[re.Pattern[str]]) -> Any | None:
+    """
+    Block-mode Hyperscan database over patterns (match id = index), or None when hyperscan
+    is missing or rejects a pattern (backreferences, lookaround, ...).
+    """
+    if hyperscan is None or not patterns:
+        return None
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=[p.pattern.encode() for p in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns),
+        )
+    except hyperscan.error:
+        return None
+    return db
 
 
 class TerminalEngine:
@@ -33,31 +174,80 @@ class TerminalEngine:
         allowlist_patterns: list[str] | None = None,
         denylist_patterns: list[str] | None = None,
         default_timeout: int = DEFAULT_TIMEOUT_SEC,
+        trusted: bool = False,
     ):
         self._root = Path(project_root or os.getcwd()).resolve()
-        self._allowlist = allowlist_patterns or []  # regex; if non-empty, command must match one
-        self._denylist = denylist_patterns or [
-            r"\brm\s+-rf\s+/",
-            r"\brm\s+-rf\s+\*",
-            r">\s*/dev/sd",
-            r"mkfs\.|dd\s+if=.*of=/dev",
-            r"chmod\s+-R\s+777",
-            r":(){ :|:& };:",  # fork bomb
-        ]
+        # regex; if non-empty, command must match one
+        self._allowlist = [re.compile(p) for p in allowlist_patterns or []]
+        self._denylist = [re.compile(p) for p in denylist_patterns or DEFAULT_DENYLIST]
+        self._allow_re = _fuse_patterns(self._allowlist)
+        self._deny_re = _fuse_patterns(self._denylist)
+        self._deny_hs = _compile_hyperscan(self._denylist)
+        self._safe_head_fast_path = not denylist_patterns and not self._allowlist
         self._default_timeout = default_timeout
+        self._base_env = dict(os.environ)
+        # Trusted engines (isolated CI/sandbox) skip allow/deny checks entirely
+        self._trusted = trusted
+        # cwd argument -> resolved directory; only existing directories are cached
+        self._resolved_cache: OrderedDict[str | Path | None, Path] = OrderedDict()
         self._background_procs: dict[str, asyncio.subprocess.Process] = {}
 
     def get_project_root(self) -> Path:
         return self._root
 
+    def refresh_env(self) -> None:
+        """Re-snapshot os.environ; child processes otherwise see the environment as of engine creation."""
+        self._base_env = dict(os.environ)
+
+    async def _resolve_cwd(self, cwd: str | Path | None) -> tuple[Path, bool]:
+        """Return (resolved work dir, is_dir), memoizing directories that exist."""
+        work_dir = self._resolved_cache.get(cwd)
+        if work_dir is not None:
+            self._resolved_cache.move_to_end(cwd)
+            return work_dir, True
+        # resolve()/is_dir() can stall on slow or network filesystems; keep them off the event loop
+        work_dir, is_dir = await asyncio.to_thread(_resolve_and_check, cwd or self._root)
+        if not is_dir:
+            return work_dir, False
+        self._resolved_cache[cwd] = work_dir
+        if len(self._resolved_cache) > RESOLVED_CWD_CACHE_SIZE:
+            self._resolved_cache.popitem(last=False)
+        return work_dir, True
+
     def _check_policy(self, command: str) -> tuple[bool, str | None]:
         """Return (allowed, error_message)."""
+        if self._trusted:
+            return True, None
         cmd_stripped = command.strip()
-        for pat in self._denylist:
-            if re.search(pat, cmd_stripped):
-                return False, f"Command denied by policy (denylist): {pat}"
+        if self._safe_head_fast_path:
+            head, _, _ = cmd_stripped.partition(" ")
+            if (
+                head in _SAFE_HEADS
+                and not _SHELL_METACHARS.search(cmd_stripped)
+                and not _DENY_KEYWORDS.search(cmd_stripped)
+            ):
+                return True, None
+        if self._deny_hs is not None and cmd_stripped.isascii():
+            # Hyperscan classes are ASCII-only; they agree with re's Unicode \s and \b on ASCII input
+            hits: list[int] = []
+            self._deny_hs.scan(
+                cmd_stripped.encode(),
+                match_event_handler=lambda pat_id, start, end, flags, ctx: hits.append(pat_id),
+            )
+            denied = self._denylist[min(hits)] if hits else None
+        elif self._deny_re is not None:
+            m = self._deny_re.search(cmd_stripped)
+            denied = self._denylist[int(m.lastgroup[1:])] if m else None
+        else:
+            denied = next((p for p in self._denylist if p.search(cmd_stripped)), None)
+        if denied is not None:
+            return False, f"Command denied by policy (denylist): {denied.pattern}"
         if self._allowlist:
-            if not any(re.search(p, cmd_stripped) for p in self._allowlist):
+            if self._allow_re is not None:
+                allowed = self._allow_re.search(cmd_stripped) is not None
+            else:
+                allowed = any(p.search(cmd_stripped) for p in self._allowlist)
+            if not allowed:
                 return False, "Command not in allowlist."
         return True, None
 
@@ -79,18 +269,16 @@ class TerminalEngine:
                 errors=[err or "Command not allowed"],
                 next_recommended_action="Use an allowed command or adjust policy.",
             )
-        work_dir = Path(cwd or self._root).resolve()
-        if not work_dir.is_dir():
+        work_dir, is_dir = await self._resolve_cwd(cwd)
+        if not is_dir:
             return _tool_result(
                 "failure",
                 errors=[f"Working directory does not exist: {work_dir}"],
                 next_recommended_action="Use a valid project path.",
             )
         timeout = timeout_sec if timeout_sec is not None else self._default_timeout
-        run_env = os.environ.copy()
-        if env:
-            run_env.update(env)
-        start = time.monotonic()
+        run_env = {**self._base_env, **env} if env else self._base_env
+        start_ns = time.monotonic_ns()
         try:
             proc = await asyncio.create_subprocess_shell(
                 command,
@@ -98,26 +286,30 @@ class TerminalEngine:
                 stderr=asyncio.subprocess.PIPE,
                 cwd=str(work_dir),
                 env=run_env,
+                start_new_session=_NEW_SESSION,
             )
             try:
-                stdout_b, stderr_b = await asyncio.wait_for(
-                    proc.communicate(),
+                stdout_b, stderr_b, _ = await asyncio.wait_for(
+                    asyncio.gather(
+                        _drain(proc.stdout, MAX_OUTPUT_BYTES),
+                        _drain(proc.stderr, MAX_OUTPUT_BYTES),
+                        proc.wait(),
+                    ),
                     timeout=timeout,
                 )
             except asyncio.TimeoutError:
-                proc.kill()
-                await proc.wait()
+                await _stop_tree(proc, TIMEOUT_KILL_GRACE_SEC)
                 return _tool_result(
                     "failure",
                     observations={
                         "exit_code": None,
                         "timed_out": True,
-                        "duration_sec": round(time.monotonic() - start, 2),
+                        "duration_sec": round((time.monotonic_ns() - start_ns) / 1e9, 2),
                     },
                     errors=[f"Command timed out after {timeout}s"],
                     next_recommended_action="Simplify command or increase timeout.",
                 )
-            duration = time.monotonic() - start
+            duration_ns = time.monotonic_ns() - start_ns
             out_decoded = stdout_b.decode("utf-8", errors="replace")[:MAX_OUTPUT_BYTES]
             err_decoded = stderr_b.decode("utf-8", errors="replace")[:MAX_OUTPUT_BYTES]
             return _tool_result(
@@ -126,7 +318,7 @@ class TerminalEngine:
                     "stdout": out_decoded,
                     "stderr": err_decoded,
                     "exit_code": proc.returncode,
-                    "duration_sec": round(duration, 2),
+                    "duration_sec": round(duration_ns / 1e9, 2),
                     "cwd": str(work_dir),
                 },
                 errors=[] if proc.returncode == 0 else [f"Exit code: {proc.returncode}"],
@@ -150,10 +342,8 @@ class TerminalEngine:
         allowed, err = self._check_policy(command)
         if not allowed:
             return _tool_result("failure", errors=[err or "Command not allowed"], next_recommended_action="Use an allowed command.")
-        work_dir = Path(cwd or self._root).resolve()
-        run_env = os.environ.copy()
-        if env:
-            run_env.update(env)
+        work_dir, _ = await self._resolve_cwd(cwd)
+        run_env = {**self._base_env, **env} if env else self._base_env
         try:
             proc = await asyncio.create_subprocess_shell(
                 command,
@@ -161,6 +351,7 @@ class TerminalEngine:
                 stderr=asyncio.subprocess.DEVNULL,
                 cwd=str(work_dir),
                 env=run_env,
+                start_new_session=_NEW_SESSION,
             )
             self._background_procs[process_id] = proc
             return _tool_result(
@@ -180,12 +371,7 @@ class TerminalEngine:
                 errors=[f"Unknown process_id: {process_id}"],
                 next_recommended_action="List background processes or use correct id.",
             )
-        try:
-            proc.terminate()
-            await asyncio.wait_for(proc.wait(), timeout=5.0)
-        except asyncio.TimeoutError:
-            proc.kill()
-            await proc.wait()
+        await _stop_tree(proc, STOP_GRACE_SEC)
         return _tool_result(
             "success",
             observations={"process_id": process_id, "stopped": True},
@@ -194,11 +380,18 @@ class TerminalEngine:
 
     async def list_background(self) -> dict[str, Any]:
         """List active background process ids."""
-        pids = {k: (p.pid if p.returncode is None else None) for k, p in list(self._background_procs.items())}
+        pids: dict[str, int | None] = {}
+        alive: dict[str, asyncio.subprocess.Process] = {}
+        for k, p in self._background_procs.items():
+            if p.returncode is None:
+                alive[k] = p
+                pids[k] = p.pid
+            else:
+                pids[k] = None
         # drop already-finished
-        self._background_procs = {k: p for k, p in self._background_procs.items() if p.returncode is None}
+        self._background_procs = alive
         return _tool_result(
             "success",
-            observations={"process_ids": list(self._background_procs.keys()), "pids": pids},
+            observations={"process_ids": list(alive), "pids": pids},
             next_recommended_action="Call stop_background(process_id) to stop.",
         )
@@ -0,0 +1,93 @@
+"""Controller: task state machine, failure bookkeeping and run_pipelined."""
+
+import asyncio
+import threading
+
+import pytest
+
+from gravitas_mcp.controller import Controller, RetryPolicy, Step
+from gravitas_mcp.memory import Memory, _tool_result
+
+
+@pytest.fixture
+def mem(tmp_path):
+    m = Memory(project_root=tmp_path)
+    yield m
+    m.close()
+
+
+def test_state_tracked_across_failures(mem):
+    c = Controller(mem)
+    tid = c.create_task("goal")["observations"]["task_id"]
+    assert c.get_state(tid)["observations"]["state"] == "PLANNING"
+    assert c.record_step_failure(tid, "x")["observations"]["state"] == "FAILED_RETRY"
+    assert c.record_step_failure(tid, "x")["observations"]["state"] == "ROLLBACK"
+    assert c.is_complete(tid)
+    # a fresh controller reads the same state back from memory
+    other = Controller(mem)
+    assert other.get_state(tid)["observations"]["state"] == "ROLLBACK"
+    assert other.is_complete(tid)
+
+
+def test_max_retries(mem):
+    c = Controller(mem, RetryPolicy(max_retries_per_step=2, identical_failure_threshold=5))
+    tid = c.create_task("goal")["observations"]["task_id"]
+    assert "retry_count" in c.record_step_failure(tid, "a")["observations"]
+    assert c.record_step_failure(tid, "b")["observations"]["reason"] == "Max retries per step exceeded."
+
+
+def test_task_ids_unique(mem):
+    c = Controller(mem)
+    ids = {c.create_task("g")["observations"]["task_id"] for _ in range(200)}
+    assert len(ids) == 200
+
+
+async def _ok():
+    await asyncio.sleep(0.01)
+    return _tool_result("success", observations={"done": True})
+
+
+async def _fail():
+    await asyncio.sleep(0.01)
+    return _tool_result("failure", errors=["boom"])
+
+
+def test_run_pipelined_success_stays_on_loop_thread(mem, monkeypatch):
+    c = Controller(mem)
+    tid = c.create_task("goal")["observations"]["task_id"]
+    loop_thread = threading.get_ident()
+    write_threads = []
+    upsert = mem.upsert_task
+    monkeypatch.setattr(mem, "upsert_task", lambda *a, **k: (write_threads.append(threading.get_ident()), upsert(*a, **k)))
+
+    res = asyncio.run(c.run_pipelined(tid, [Step("CODING", _ok, "code"), Step("EXECUTING", _ok), Step("VERIFYING")]))
+    assert res["status"] == "success"
+    assert res["observations"]["state"] == "VERIFYING"
+    assert [r["step"] for r in res["observations"]["results"]] == ["code", "step_1"]
+    assert write_threads and set(write_threads) == {loop_thread}
+    assert Controller(mem).get_state(tid)["observations"]["state"] == "VERIFYING"
+
+
+def test_run_pipelined_stops_on_failure(mem):
+    c = Controller(mem)
+    tid = c.create_task("goal")["observations"]["task_id"]
+    ran = []
+
+    async def never():
+        ran.append(True)
+        return _tool_result("success")
+
+    res = asyncio.run(c.run_pipelined(tid, [Step("EXECUTING", _fail, "run"), Step("VERIFYING", never)]))
+    assert res["status"] == "failure"
+    assert res["errors"] == ["boom"]
+    assert res["observations"]["failed_step"] == "run"
+    assert res["observations"]["state"] == "FAILED_RETRY"
+    assert not ran
+
+
+def test_run_pipelined_rejects_invalid_state(mem):
+    c = Controller(mem)
+    tid = c.create_task("goal")["observations"]["task_id"]
+    res = asyncio.run(c.run_pipelined(tid, [Step("CODING", _ok), Step("NOPE")]))
+    assert res["status"] == "failure"
+    assert c.get_state(tid)["observations"]["state"] == "PLANNING"
@@ -0,0 +1,218 @@
+"""Memory: JSON column encoding, batching, read pool and snapshot promotion."""
+
+import json
+import math
+import sqlite3
+import time
+
+import pytest
+
+from gravitas_mcp import memory as memory_mod
+from gravitas_mcp.memory import Memory
+
+
+@pytest.fixture
+def mem(tmp_path):
+    m = Memory(project_root=tmp_path)
+    yield m
+    m.close()
+
+
+def test_dumps_loads_roundtrip_beyond_orjson_range():
+    value = {"n": 2**70, "s": "x", 1: [1.5, None]}
+    assert json.loads(memory_mod._dumps(value))["n"] == 2**70
+    assert memory_mod._loads(memory_mod._dumps({"n": 2**70})) == {"n": 2**70}
+
+
+def test_loads_reads_stdlib_nan_rows():
+    text = json.dumps({"x": float("nan"), "y": float("inf")})
+    decoded = memory_mod._loads(text)
+    assert math.isnan(decoded["x"]) and decoded["y"] == float("inf")
+
+
+def test_record_failure_with_big_int(mem):
+    res = mem.record_failure("big", {"n": 2**70})
+    assert res["status"] == "success", res
+    assert mem.get_failure_summary()[0]["context"] == {"n": 2**70}
+
+
+def test_legacy_nan_failure_row_readable(mem):
+    conn = mem._connect()
+    conn.execute(
+        memory_mod._SQL["insert_failure"],
+        ("fail_legacy", "nan", json.dumps({"v": float("nan")}), time.time(), None),
+    )
+    conn.commit()
+    (failure,) = mem.get_failure_summary()
+    assert math.isnan(failure["context"]["v"])
+
+
+def _seed_failures(mem, n):
+    mem.record_failures_batch([(f"r{i}", {"i": i}) for i in range(n)])
+
+
+def test_read_pool_exhaustion_does_not_block(mem):
+    _seed_failures(mem, 3)
+    gens = [mem.iter_failures() for _ in range(memory_mod.READ_POOL_SIZE + 3)]
+    firsts = [next(g) for g in gens]  # every generator holds its cursor open
+    assert all(f["reason"] in {"r0", "r1", "r2"} for f in firsts)
+    assert len(mem._readers) == memory_mod.READ_POOL_SIZE
+    assert len(mem.get_failure_summary()) == 3
+    for g in gens:
+        g.close()
+    assert mem._read_pool.qsize() == memory_mod.READ_POOL_SIZE
+
+
+def test_close_does_not_repool_checked_out_reader(mem):
+    _seed_failures(mem, 2)
+    gen = mem.iter_failures()
+    next(gen)
+    (held,) = mem._readers
+    mem.close()
+    gen.close()
+    assert mem._read_pool.empty()
+    # memory reopens lazily and hands out only live readers
+    assert len(mem.get_failure_summary()) == 2
+    assert held not in mem._readers
+    with pytest.raises(sqlite3.ProgrammingError):
+        held.execute("SELECT 1")
+
+
+def _failure_count(m):
+    with m._read_cursor() as cur:
+        return cur.execute("SELECT COUNT(*) FROM failures").fetchone()[0]
+
+
+def test_batch_defers_commit_until_exit(tmp_path):
+    writer = Memory(project_root=tmp_path, max_batch_size=100, batch_wait_timeout_s=60)
+    reader = Memory(project_root=tmp_path)
+    try:
+        writer.record_failure("before", {})
+        with writer.batch():
+            for i in range(3):
+                writer.record_failure(f"r{i}", {})
+            assert _failure_count(writer) == 4  # own uncommitted writes are visible
+            assert _failure_count(reader) == 1
+        assert _failure_count(reader) == 4
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_batch_flushes_when_full(tmp_path):
+    writer = Memory(project_root=tmp_path, max_batch_size=2, batch_wait_timeout_s=60)
+    reader = Memory(project_root=tmp_path)
+    try:
+        with writer.batch():
+            writer.record_failure("a", {})
+            writer.record_failure("b", {})
+            assert _failure_count(reader) == 2
+            writer.record_failure("c", {})
+            assert _failure_count(reader) == 2
+        assert _failure_count(reader) == 3
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_batch_rolls_back_on_exception(tmp_path):
+    writer = Memory(project_root=tmp_path, max_batch_size=100, batch_wait_timeout_s=60)
+    reader = Memory(project_root=tmp_path)
+    try:
+        writer.record_failure("kept", {})
+        with pytest.raises(RuntimeError):
+            with writer.batch():
+                writer.record_failure("dropped", {})
+                raise RuntimeError("boom")
+        assert not writer._connect().in_transaction
+        assert _failure_count(writer) == 1
+        assert _failure_count(reader) == 1
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_batch_flushes_stale_writes_on_read(tmp_path):
+    writer = Memory(project_root=tmp_path, max_batch_size=100, batch_wait_timeout_s=0.05)
+    reader = Memory(project_root=tmp_path)
+    try:
+        with writer.batch():
+            writer.record_failure("a", {})
+            assert _failure_count(reader) == 0
+            time.sleep(0.06)
+            writer.get_failure_summary()
+            assert not writer._connect().in_transaction
+            assert _failure_count(reader) == 1
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_transaction_inside_batch_rolls_back_only_itself(tmp_path):
+    writer = Memory(project_root=tmp_path, max_batch_size=100, batch_wait_timeout_s=60)
+    try:
+        with writer.batch():
+            writer.record_failure("outer", {})
+            with pytest.raises(sqlite3.IntegrityError):
+                with writer._transaction() as conn:
+                    conn.execute(memory_mod._SQL["insert_failure"], ("dup", "x", "{}", time.time(), None))
+                    conn.execute(memory_mod._SQL["insert_failure"], ("dup", "x", "{}", time.time(), None))
+            writer.record_failure("after", {})
+        assert sorted(f["reason"] for f in writer.get_failure_summary()) == ["after", "outer"]
+    finally:
+        writer.close()
+
+
+def test_save_and_promote_snapshot(mem):
+    mem.upsert_task("t1", "goal", "PLANNING")
+    assert mem.get_canonical_state()["observations"]["has_canonical"] is False
+    mem.save_and_promote_snapshot("s1", "t1", {"": {"a.py": "FILE"}}, ["a.py"], [".git"])
+    obs = mem.get_canonical_state()["observations"]
+    assert obs["has_canonical"] is True
+    assert obs["canonical_snapshot"]["id"] == "s1"
+    assert obs["canonical_snapshot"]["project_map"] == {"": {"a.py": "FILE"}}
+
+    mem.save_and_promote_snapshot("s2", "t1", {}, [], [])
+    assert mem.get_canonical_state()["observations"]["canonical_snapshot"]["id"] == "s2"
+
+
+def test_save_and_promote_snapshot_is_atomic(mem):
+    mem.upsert_task("t1", "goal", "PLANNING")
+    mem.save_and_promote_snapshot("s1", "t1", {}, [], [])
+    mem.save_snapshot("s2", "t1", {}, [], [])
+    with pytest.raises(sqlite3.IntegrityError):
+        mem.save_and_promote_snapshot("s2", "t1", {"dup": True}, [], [])
+    assert not mem._connect().in_transaction
+    assert mem.get_canonical_state()["observations"]["canonical_snapshot"]["id"] == "s1"
+
+
+def test_caches_see_commits_from_another_connection(tmp_path):
+    a = Memory(project_root=tmp_path)
+    b = Memory(project_root=tmp_path)
+    try:
+        a.upsert_task("t1", "old goal", "PLANNING")
+        a.save_and_promote_snapshot("s1", "t1", {}, [], [])
+        assert b.get_task("t1")["goal"] == "old goal"
+        assert b.get_canonical_state()["observations"]["canonical_snapshot"]["id"] == "s1"
+
+        a.upsert_task("t1", "new goal", "CODING")
+        a.save_and_promote_snapshot("s2", "t1", {}, [], [])
+        task = b.get_task("t1")
+        assert (task["goal"], task["state"]) == ("new goal", "CODING")
+        assert b.get_canonical_state()["observations"]["canonical_snapshot"]["id"] == "s2"
+    finally:
+        a.close()
+        b.close()
+
+
+def test_cached_reads_return_copies(mem):
+    mem.upsert_task("t1", "goal", "PLANNING", metadata={"k": 1})
+    mem.save_and_promote_snapshot("s1", "t1", {"": {"a.py": "FILE"}}, ["a.py"], [])
+    for _ in range(2):
+        mem.get_task("t1")["metadata"]["k"] = 2
+        snap = mem.get_canonical_state()["observations"]["canonical_snapshot"]
+        snap["project_map"][""]["x"] = "FILE"
+        snap["safe_to_edit"].append("b.py")
+    assert mem.get_task("t1")["metadata"] == {"k": 1}
+    snap = mem.get_canonical_state()["observations"]["canonical_snapshot"]
+    assert snap["project_map"] == {"": {"a.py": "FILE"}} and snap["safe_to_edit"] == ["a.py"]
@@ -0,0 +1,146 @@
+"""project_intel: the iterative walk must reproduce the original recursive walk exactly."""
+
+import json
+import os
+import random
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from gravitas_mcp import project_intel
+from gravitas_mcp.memory import Memory
+from gravitas_mcp.project_intel import DEFAULT_IGNORE, collect_structure, get_project_map
+
+
+def _reference_should_ignore(name: str, ignore_set: set[str]) -> bool:
+    for skip in ignore_set:
+        if skip.startswith("*"):
+            if name.endswith(skip[1:]):
+                return True
+        elif name == skip:
+            return True
+    return False
+
+
+def _reference_collect(root, max_depth, max_entries, ignore=None) -> dict[str, Any]:
+    """The original recursive Path.iterdir walk, kept as the behavioural spec."""
+    root = Path(root).resolve()
+    ignore_set = ignore or DEFAULT_IGNORE
+    count = [0]
+
+    def walk(dir_path: Path, depth: int) -> dict[str, Any]:
+        if depth > max_depth or count[0] >= max_entries:
+            return {}
+        node: dict[str, Any] = {}
+        try:
+            entries = sorted(dir_path.iterdir(), key=lambda p: (p.is_file(), p.name.lower()))
+        except OSError:
+            return {}
+        for p in entries:
+            if count[0] >= max_entries:
+                break
+            if _reference_should_ignore(p.name, ignore_set):
+                continue
+            if p.is_file():
+                node[p.name] = "FILE"
+            else:
+                child = walk(p, depth + 1)
+                node[p.name] = child if child else "DIR"
+            count[0] += 1
+        return node
+
+    top = walk(root, 0)
+    return {"": top, "_meta": {"root": str(root), "max_depth": max_depth, "entries_count": count[0]}}
+
+
+NAMES = ["a", "B", "b", "A", "src", "node_modules", ".git", "x.egg-info", "Zeta", "zeta", "k.py", "K.py", "empty"]
+
+
+def _make_tree(rnd: random.Random, d: str, depth: int) -> None:
+    for _ in range(rnd.randint(0, 6)):
+        p = os.path.join(d, rnd.choice(NAMES) + rnd.choice(["", "", "1", "_2"]))
+        if os.path.lexists(p):
+            continue
+        r = rnd.random()
+        if r < 0.45 and depth < 4:
+            os.mkdir(p)
+            _make_tree(rnd, p, depth + 1)
+        elif r < 0.5:
+            os.mkdir(p)
+        elif r < 0.55:
+            os.symlink(rnd.choice(["/nonexistent", d]), p)
+        else:
+            open(p, "w").close()
+
+
+@pytest.mark.parametrize("seed", range(12))
+@pytest.mark.parametrize("parallel", [False, True])
+def test_walk_matches_reference(tmp_path, seed, parallel):
+    _make_tree(random.Random(seed), str(tmp_path), 0)
+    for max_depth in (-1, 0, 1, 3, 8):
+        for max_entries in (0, 1, 3, 7, 2000):
+            for ignore in (None, {"a", "*1"}):
+                expected = _reference_collect(tmp_path, max_depth, max_entries, ignore)
+                got = collect_structure(tmp_path, max_depth, max_entries, ignore, parallel=parallel)
+                assert json.dumps(got) == json.dumps(expected), (max_depth, max_entries, ignore)
+
+
+def test_glob_ignore_entries(tmp_path):
+    for name in ("test_one.py", "keep.py", "m.pyc", "m.pyo", "m.py", "x.egg-info", "zx"):
+        (tmp_path / name).write_text("")
+    tree = collect_structure(tmp_path, ignore={"test_*", "*.py[co]", "*.egg-info", "?x"})[""]
+    assert sorted(tree) == ["keep.py", "m.py"]
+
+
+def test_project_map_cache_invalidated_by_top_level_change(tmp_path):
+    project_intel._PROJECT_MAP_CACHE.clear()
+    (tmp_path / "pkg").mkdir()
+    first = get_project_map(tmp_path)
+    assert first["status"] == "success"
+    second = get_project_map(tmp_path)
+    assert second == first and second is not first
+    second["observations"]["structure"][""]["mutated"] = "FILE"
+    assert "mutated" not in get_project_map(tmp_path)["observations"]["structure"][""]
+
+    (tmp_path / "pkg" / "mod.py").write_text("")
+    os.utime(tmp_path / "pkg", ns=(1, 1))  # force a distinct mtime even on coarse-grained filesystems
+    third = get_project_map(tmp_path)
+    assert third["observations"]["structure"][""]["pkg"] == {"mod.py": "FILE"}
+
+
+def test_project_map_not_a_directory(tmp_path):
+    res = get_project_map(tmp_path / "missing")
+    assert res["status"] == "failure"
+
+
+def test_project_map_cache_invalidated_by_deep_change(tmp_path):
+    project_intel._PROJECT_MAP_CACHE.clear()
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    assert get_project_map(tmp_path)["observations"]["structure"][""] == {"src": {"pkg": "DIR"}}
+    (tmp_path / "src" / "pkg" / "new.py").write_text("")
+    os.utime(tmp_path / "src" / "pkg", ns=(1, 1))  # distinct mtime even on coarse-grained filesystems
+    assert get_project_map(tmp_path)["observations"]["structure"][""] == {"src": {"pkg": {"new.py": "FILE"}}}
+    (tmp_path / "src" / "pkg" / "new.py").unlink()
+    os.utime(tmp_path / "src" / "pkg", ns=(2, 2))
+    assert get_project_map(tmp_path)["observations"]["structure"][""] == {"src": {"pkg": "DIR"}}
+
+
+def test_collect_structure_reports_walked_dirs(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "node_modules").mkdir()
+    dir_mtimes = []
+    collect_structure(tmp_path, dir_mtimes=dir_mtimes)
+    assert sorted(p for p, _ in dir_mtimes) == sorted(str(p) for p in (tmp_path, tmp_path / "a", tmp_path / "a" / "b"))
+    assert all(m == os.stat(p).st_mtime_ns for p, m in dir_mtimes)
+
+
+def test_brain_db_and_wal_sidecars_ignored(tmp_path):
+    (tmp_path / "app.py").write_text("")
+    mem = Memory(project_root=tmp_path)
+    try:
+        mem.record_failure("x", {})  # opens the DB in WAL mode; -wal/-shm exist while it is open
+        assert (tmp_path / ".gravitas_brain.db-wal").exists()
+        assert collect_structure(tmp_path)[""] == {"app.py": "FILE"}
+    finally:
+        mem.close()
@@ -0,0 +1,91 @@
+"""TerminalEngine._check_policy: the fast paths must never allow what the full denylist sweep denies."""
+
+import pytest
+
+from gravitas_mcp.terminal import TerminalEngine
+
+DENIED = [
+    "rm -rf /",
+    "rm -rf *",
+    "git rm -rf *",
+    "git rm -rf /tmp/rv",
+    "echo x > /dev/sda",
+    "ls >/dev/sdb",
+    "dd if=/dev/zero of=/dev/sda",
+    "python -m mkfs.ext4",
+    "chmod -R 777 /",
+    "cat foo; rm -rf /",
+    "chmod -R 777 /; rm -rf /",
+    ":(){ :|:& };:",
+]
+
+ALLOWED = [
+    "ls -la",
+    "cat README.md",
+    "echo hello",
+    "git status",
+    "git add -A",
+    "git rm --cached foo.txt",
+    "python -m pytest -q",
+    "pytest tests",
+    "pip install -e .",
+    "npm run build",
+    "cargo test",
+    "rm -rf build",
+    "make dd",
+]
+
+
+@pytest.fixture
+def engines(tmp_path):
+    fast = TerminalEngine(project_root=tmp_path)
+    full = TerminalEngine(project_root=tmp_path)
+    full._safe_head_fast_path = False
+    full._deny_hs = None
+    full._deny_re = None
+    return fast, full
+
+
+@pytest.mark.parametrize("command", DENIED)
+def test_denylist_blocks(engines, command):
+    fast, full = engines
+    allowed, err = fast._check_policy(command)
+    assert not allowed
+    assert err and err.startswith("Command denied by policy (denylist)")
+    assert not full._check_policy(command)[0]
+
+
+@pytest.mark.parametrize("command", ALLOWED)
+def test_ordinary_commands_allowed(engines, command):
+    fast, full = engines
+    assert fast._check_policy(command) == (True, None)
+    assert full._check_policy(command) == (True, None)
+
+
+@pytest.mark.parametrize("command", DENIED + ALLOWED)
+def test_fast_paths_agree_with_full_sweep(engines, command):
+    fast, full = engines
+    assert fast._check_policy(command)[0] == full._check_policy(command)[0]
+
+
+def test_trusted_skips_policy(tmp_path):
+    assert TerminalEngine(project_root=tmp_path, trusted=True)._check_policy("rm -rf /") == (True, None)
+
+
+def test_allowlist(tmp_path):
+    engine = TerminalEngine(project_root=tmp_path, allowlist_patterns=[r"^git\b"])
+    assert engine._check_policy("git status") == (True, None)
+    assert engine._check_policy("ls") == (False, "Command not in allowlist.")
+    assert not engine._check_policy("git rm -rf *")[0]
+
+
+def test_inline_global_flags_stay_per_pattern(tmp_path):
+    engine = TerminalEngine(
+        project_root=tmp_path, allowlist_patterns=[r"^git\b", r"(?i)^make\b"], denylist_patterns=["foo", "(?i)bar"]
+    )
+    assert engine._allow_re is None and engine._deny_re is None
+    engine._deny_hs = None
+    assert engine._check_policy("git FOO")[0] is True
+    assert engine._check_policy("git BAR")[0] is False
+    assert engine._check_policy("MAKE test") == (True, None)
+    assert engine._check_policy("GIT status") == (False, "Command not in allowlist.")
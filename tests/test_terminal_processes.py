@@ -0,0 +1,77 @@
+"""Background process stop: SIGTERM the whole group, wait the grace period, then SIGKILL what is left."""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from gravitas_mcp import terminal
+from gravitas_mcp.terminal import TerminalEngine
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="process groups are POSIX-only")
+
+CHILD = """
+import pathlib, signal, sys, time
+out = pathlib.Path(sys.argv[1])
+def on_term(signum, frame):
+    time.sleep({handler_sec})
+    out.joinpath("handled").write_text("ok")
+    sys.exit(0)
+signal.signal(signal.SIGTERM, {handler})
+out.joinpath("ready").write_text("ok")
+while True:
+    time.sleep(0.05)
+"""
+
+
+def _start_and_stop(tmp_path, handler: str, handler_sec: float = 0.0) -> float:
+    script = tmp_path / "child.py"
+    script.write_text(CHILD.format(handler=handler, handler_sec=handler_sec))
+
+    async def run() -> float:
+        engine = TerminalEngine(project_root=tmp_path)
+        command = f"{sys.executable} child.py {tmp_path}; echo done"
+        res = await engine.start_background(command, "child")
+        assert res["status"] == "success", res
+        for _ in range(200):
+            if (tmp_path / "ready").exists():
+                break
+            await asyncio.sleep(0.02)
+        start = time.monotonic()
+        res = await engine.stop_background("child")
+        assert res["status"] == "success"
+        return time.monotonic() - start
+
+    return asyncio.run(run())
+
+
+def test_children_get_grace_period_after_shell_exits(tmp_path):
+    elapsed = _start_and_stop(tmp_path, handler="on_term", handler_sec=0.5)
+    assert (tmp_path / "handled").exists()
+    assert elapsed < terminal.STOP_GRACE_SEC
+
+
+def test_group_killed_after_grace(tmp_path, monkeypatch):
+    monkeypatch.setattr(terminal, "STOP_GRACE_SEC", 0.3)
+    elapsed = _start_and_stop(tmp_path, handler="signal.SIG_IGN")
+    assert 0.3 <= elapsed < 3.0
+    assert not (tmp_path / "handled").exists()
+
+
+def test_recycled_leader_pid_not_signalled(tmp_path, monkeypatch):
+    async def run() -> list[tuple[int, int]]:
+        engine = TerminalEngine(project_root=tmp_path)
+        res = await engine.start_background("true", "quick")
+        assert res["status"] == "success", res
+        proc = engine._background_procs["quick"]
+        await proc.wait()
+        # pretend the reaped leader's pid now belongs to an unrelated process leading its own group
+        monkeypatch.setattr(terminal.os, "getpgid", lambda pid: pid)
+        sent = []
+        monkeypatch.setattr(terminal.os, "killpg", lambda pgid, sig: sent.append((pgid, sig)))
+        assert (await engine.stop_background("quick"))["status"] == "success"
+        return sent
+
+    assert asyncio.run(run()) == []